@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+# ---------------- Branding exposure ledger ----------------
+# branding_exposure_ledger holds the hours accumulated per contract per
+# exposure window (Daily / Weekly / Monthly, anything else = whole contract).
+# branding_exposure_deficit holds, per train and per period, the hours still
+# owed: a row covers [window_start, window_end), the overlap of the windows of
+# every contract active on the train. Keying by period means a run for next
+# week gets its own row and never replaces the one today's run reads. Both
+# tables are updated incrementally as service hours are logged, so the scorer
+# reads one precomputed row per train.
+
+def create_branding_tables(curr):
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS branding_exposure_ledger (
+            contract_id INT NOT NULL,
+            window_start TIMESTAMP NOT NULL,
+            window_end TIMESTAMP,
+            hours_accumulated NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (contract_id, window_start)
+        )
+    """)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS branding_exposure_deficit (
+            train_id INT NOT NULL,
+            window_start TIMESTAMP NOT NULL,
+            window_end TIMESTAMP,
+            hours_owed NUMERIC NOT NULL,
+            hours_required NUMERIC NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (train_id, window_start)
+        )
+    """)
+
+def window_bounds(window_type, at, start_date=None, end_date=None):
+    """
+    Return (window_start, window_end) of the exposure window containing at.
+    """
+    day = datetime.combine(at.date(), datetime.min.time())
+    if window_type == "Daily":
+        return day, day + timedelta(days=1)
+    if window_type == "Weekly":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    if window_type == "Monthly":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start, end
+    # whole-contract window
+    start = datetime.combine(start_date, datetime.min.time()) if start_date else datetime.min
+    end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1) if end_date else None
+    return start, end
+
+def _as_date(val):
+    return val.date() if isinstance(val, datetime) else val
+
+def active_contracts(curr, train_id, at):
+    curr.execute("""
+        SELECT contract_id, exposure_required_hours, window_type, start_date, end_date
+        FROM branding_contract
+        WHERE train_id = %s
+          AND validity_range(start_date, end_date) @> %s::timestamp
+    """, (train_id, at))
+    return curr.fetchall()
+
+def refresh_train_deficit(curr, train_id, at=None):
+    """
+    Recompute the deficit row of one train for the period containing at.
+    Trains without a contract requiring hours get no row.
+    """
+    at = at or datetime.now()
+    hours_owed, hours_required = 0.0, 0.0
+    window_start, window_end = None, None
+
+    for contract_id, required, window_type, start_date, end_date in active_contracts(curr, train_id, at):
+        if not required:
+            continue
+        start, end = window_bounds(window_type, at, _as_date(start_date), _as_date(end_date))
+        curr.execute("""
+            SELECT hours_accumulated FROM branding_exposure_ledger
+            WHERE contract_id = %s AND window_start = %s
+        """, (contract_id, start))
+        row = curr.fetchone()
+        accumulated = float(row[0]) if row else 0.0
+        owed = max(0.0, float(required) - accumulated)
+
+        hours_required += float(required)
+        hours_owed += owed
+        if window_start is None or start > window_start:
+            window_start = start
+        if end is not None and (window_end is None or end < window_end):
+            window_end = end
+
+    if window_start is None:
+        return
+
+    curr.execute("""
+        INSERT INTO branding_exposure_deficit (
+            train_id, window_start, window_end, hours_owed, hours_required, updated_at
+        ) VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (train_id, window_start) DO UPDATE SET
+            window_end = EXCLUDED.window_end,
+            hours_owed = EXCLUDED.hours_owed,
+            hours_required = EXCLUDED.hours_required,
+            updated_at = EXCLUDED.updated_at
+    """, (train_id, window_start, window_end, hours_owed, hours_required))
+
+def log_service_hours(curr, train_id, hours, at=None):
+    """
+    Credit hours of revenue service to every contract active on the train
+    and refresh that train's deficit. Rows projected for later periods may
+    overlap a whole-contract window that just got credited, so they are
+    dropped and recomputed when a run asks for them.
+    """
+    at = at or datetime.now()
+    for contract_id, required, window_type, start_date, end_date in active_contracts(curr, train_id, at):
+        start, end = window_bounds(window_type, at, _as_date(start_date), _as_date(end_date))
+        curr.execute("""
+            INSERT INTO branding_exposure_ledger (contract_id, window_start, window_end, hours_accumulated)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (contract_id, window_start) DO UPDATE SET
+                hours_accumulated = branding_exposure_ledger.hours_accumulated + EXCLUDED.hours_accumulated
+        """, (contract_id, start, end, hours))
+        curr.execute("""
+            UPDATE branding_contract
+            SET exposure_accumulated_hours = COALESCE(exposure_accumulated_hours, 0) + %s
+            WHERE contract_id = %s
+        """, (hours, contract_id))
+
+    refresh_train_deficit(curr, train_id, at)
+    curr.execute("""
+        DELETE FROM branding_exposure_deficit
+        WHERE train_id = %s AND window_start > %s
+    """, (train_id, at))
+
+def refresh_due_deficits(curr, at=None):
+    """
+    Make sure every train with an active contract has a deficit row for the
+    period containing at; only trains without one are computed.
+    """
+    at = at or datetime.now()
+    # periods that ended over a month ago are no longer read by anything
+    curr.execute("""
+        DELETE FROM branding_exposure_deficit
+        WHERE window_end < CURRENT_TIMESTAMP - INTERVAL '31 days'
+    """)
+    curr.execute("""
+        SELECT DISTINCT bc.train_id
+        FROM branding_contract bc
+        WHERE validity_range(bc.start_date, bc.end_date) @> %(at)s::timestamp
+          AND NOT EXISTS (
+              SELECT 1 FROM branding_exposure_deficit bd
+              WHERE bd.train_id = bc.train_id
+                AND bd.window_start <= %(at)s
+                AND (bd.window_end IS NULL OR bd.window_end > %(at)s)
+          )
+    """, {"at": at})
+    for (train_id,) in curr.fetchall():
+        refresh_train_deficit(curr, train_id, at)
@@ -0,0 +1,191 @@
+"""
+Cleaning bay and crew scheduler.
+
+Assigns every pending cleaning_schedule row whose deadline is still ahead to
+a bay and a crew of its depot so that as many as possible finish before the
+induction cutoff. Jobs are taken earliest-deadline-first (longest first on
+ties) and each one goes to the bay/crew pair that frees up first; jobs that would be late anyway are
+deferred behind the on-time ones. Both pools are heaps, so a full depot
+schedules in O(n log n).
+
+The planned start/end are written back to cleaning_schedule together with
+the planning time (planned_at) and the departure planned for (planned_for).
+The induction feature query only treats a cleaning as ready when it was
+planned for that same departure and ends between planned_at and the
+departure; any other row needs status 'Done'.
+"""
+import heapq
+import json
+import os
+from datetime import datetime, timedelta
+
+from db import get_connection
+from schema import ensure_schema
+
+# cleaning bays and crews per depot, e.g.
+#   KMRL_CLEANING_RESOURCES='{"1": {"bays": [1, 2], "crews": ["Crew A", "Crew B"]}}'
+# a depot that is not listed is never scheduled
+CLEANING_RESOURCES = {
+    int(depot_id): cfg
+    for depot_id, cfg in json.loads(os.environ.get("KMRL_CLEANING_RESOURCES", "{}")).items()
+}
+DEFAULT_DURATION_HOURS = 2.0
+
+def cleaning_resources(depot_id):
+    """
+    (bays, crews) configured for a depot; ValueError when it has none.
+    """
+    cfg = CLEANING_RESOURCES.get(depot_id) or {}
+    bays, crews = list(cfg.get("bays") or []), list(cfg.get("crews") or [])
+    if not bays or not crews:
+        raise ValueError(f"no cleaning bays/crews configured for depot {depot_id} (KMRL_CLEANING_RESOURCES)")
+    return bays, crews
+
+def has_cleaning_resources(depot_id=None):
+    if depot_id is None:
+        return any(has_cleaning_resources(d) for d in CLEANING_RESOURCES)
+    cfg = CLEANING_RESOURCES.get(depot_id) or {}
+    return bool(cfg.get("bays")) and bool(cfg.get("crews"))
+
+def create_cleaning_columns(curr):
+    curr.execute("""
+        ALTER TABLE cleaning_schedule
+            ADD COLUMN IF NOT EXISTS planned_start TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS planned_end TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS planned_at TIMESTAMP,
+            ADD COLUMN IF NOT EXISTS planned_for TIMESTAMP
+    """)
+
+def as_datetime(val):
+    # deadline may be a DATE column; a date deadline means end of that day
+    if val is None or isinstance(val, datetime):
+        return val
+    return datetime.combine(val, datetime.max.time())
+
+def plan_cleanings(jobs, bays, crews, start, cutoff):
+    """
+    jobs: list of (key, train_id, duration_hours, deadline).
+    Returns (assignments, summary); each assignment is a dict with
+    key, train_id, bay_id, crew, planned_start, planned_end, late.
+    """
+    bay_heap = [(start, i, bay) for i, bay in enumerate(bays)]
+    crew_heap = [(start, i, crew) for i, crew in enumerate(crews)]
+    heapq.heapify(bay_heap)
+    heapq.heapify(crew_heap)
+
+    def due(job):
+        deadline = job[3]
+        return min(deadline, cutoff) if deadline else cutoff
+
+    ordered = sorted(jobs, key=lambda job: (due(job), -(job[2] or DEFAULT_DURATION_HOURS)))
+
+    assignments = []
+
+    def assign(job, begin, bay_entry, crew_entry):
+        key, train_id, duration, deadline = job
+        end = begin + timedelta(hours=float(duration or DEFAULT_DURATION_HOURS))
+        heapq.heappush(bay_heap, (end, bay_entry[1], bay_entry[2]))
+        heapq.heappush(crew_heap, (end, crew_entry[1], crew_entry[2]))
+        assignments.append({
+            "key": key,
+            "train_id": train_id,
+            "bay_id": bay_entry[2],
+            "crew": crew_entry[2],
+            "planned_start": begin,
+            "planned_end": end,
+            "late": end > due(job)
+        })
+
+    # jobs that would miss their due time anyway are deferred to the end so
+    # they don't push on-time jobs late (Moore-Hodgson style)
+    deferred = []
+    for job in ordered:
+        bay_entry = heapq.heappop(bay_heap)
+        crew_entry = heapq.heappop(crew_heap)
+        begin = max(bay_entry[0], crew_entry[0])
+        if begin + timedelta(hours=float(job[2] or DEFAULT_DURATION_HOURS)) > due(job):
+            heapq.heappush(bay_heap, bay_entry)
+            heapq.heappush(crew_heap, crew_entry)
+            deferred.append(job)
+            continue
+        assign(job, begin, bay_entry, crew_entry)
+
+    # longest first keeps the makespan of the leftovers short
+    for job in sorted(deferred, key=lambda job: -(job[2] or DEFAULT_DURATION_HOURS)):
+        bay_entry = heapq.heappop(bay_heap)
+        crew_entry = heapq.heappop(crew_heap)
+        assign(job, max(bay_entry[0], crew_entry[0]), bay_entry, crew_entry)
+
+    summary = {
+        "jobs": len(assignments),
+        "makespan_hours": round(max(((a["planned_end"] - start).total_seconds() for a in assignments),
+                                    default=0.0) / 3600.0, 2),
+        "missed": sum(1 for a in assignments if a["late"]),
+        "ready_by_cutoff": sum(1 for a in assignments if a["planned_end"] <= cutoff)
+    }
+    return assignments, summary
+
+def schedule_cleanings(cutoff, depot_id=None, start=None, save=True):
+    """
+    Schedule pending cleanings between start (default: now) and the
+    induction cutoff onto the depot's own bays and crews, and write the
+    plan back. depot_id=None schedules every configured depot.
+    Returns (assignments, summary).
+    """
+    start = start or datetime.now()
+    if depot_id is None:
+        depot_ids = [d for d in sorted(CLEANING_RESOURCES) if has_cleaning_resources(d)]
+        if not depot_ids:
+            raise ValueError("no cleaning bays/crews configured (KMRL_CLEANING_RESOURCES)")
+    else:
+        depot_ids = [depot_id]
+    pools = {d: cleaning_resources(d) for d in depot_ids}
+
+    ensure_schema()
+    conn = get_connection()
+    curr = conn.cursor()
+
+    assignments, summaries = [], []
+    for d in depot_ids:
+        # rows whose deadline already passed are left alone; FOR UPDATE keeps
+        # the rest stable until commit
+        curr.execute("""
+            SELECT cs.cleaning_id, cs.train_id, cs.duration_hours, cs.deadline
+            FROM cleaning_schedule cs
+            JOIN train t ON t.train_id = cs.train_id
+            WHERE COALESCE(cs.required, TRUE)
+              AND COALESCE(cs.status, 'Scheduled') NOT IN ('Done', 'In Progress')
+              AND (cs.deadline IS NULL OR cs.deadline >= %(start)s::date)
+              AND t.depot_id = %(depot_id)s
+            FOR UPDATE OF cs
+        """, {"depot_id": d, "start": start})
+        jobs = [(key, train_id, duration, as_datetime(deadline))
+                for key, train_id, duration, deadline in curr.fetchall()]
+        jobs = [job for job in jobs if job[3] is None or job[3] >= start]
+
+        bays, crews = pools[d]
+        depot_assignments, summary = plan_cleanings(jobs, bays, crews, start, cutoff)
+        assignments.extend(depot_assignments)
+        summaries.append(summary)
+
+    if save:
+        for a in assignments:
+            curr.execute("""
+                UPDATE cleaning_schedule
+                SET bay_id = %s, crew_assigned = %s, planned_start = %s, planned_end = %s,
+                    planned_at = %s, planned_for = %s, status = 'Scheduled'
+                WHERE cleaning_id = %s
+            """, (a["bay_id"], a["crew"], a["planned_start"], a["planned_end"], start, cutoff, a["key"]))
+        conn.commit()
+    else:
+        conn.rollback()
+    curr.close()
+    conn.close()
+
+    summary = {
+        "jobs": sum(s["jobs"] for s in summaries),
+        "makespan_hours": max((s["makespan_hours"] for s in summaries), default=0.0),
+        "missed": sum(s["missed"] for s in summaries),
+        "ready_by_cutoff": sum(s["ready_by_cutoff"] for s in summaries)
+    }
+    return assignments, summary
@@ -0,0 +1,343 @@
+"""
+Command-line entry point for induction runs (cron / systemd timers).
+
+    python cli.py induct --required-count 3 --depot 1
+    python cli.py dry-run --at 2026-10-20T05:00 --format json
+    python cli.py dry-run --at 2026-10-20T05:00 --at 2026-10-21T05:00
+    python cli.py export --format csv
+    python cli.py benchmark --repeat 20
+    python cli.py compare --strategy weighted_top_n --strategy raw_top_n
+    python cli.py horizon --days 7 --at 2026-10-20T05:00
+    python cli.py clean --at 2026-10-20T05:00
+    python cli.py replay snapshots/*.kmsnap --strategy raw_top_n
+    python cli.py forecast --depot 1
+
+Only argparse is imported at startup; each command imports the modules it
+needs, and nothing here pulls in Flask.
+"""
+import argparse
+import sys
+
+LIST_COLUMNS = [
+    "list_type", "train_id", "score", "fitness_valid", "job_card_open", "blocks_service",
+    "priority_level", "cumulative_km", "required", "cleaning_status",
+    "estimated_shunt_moves", "shunt_moves", "fitness", "branding", "mileage", "cleaning",
+    "geometry"
+]
+
+# ---------------- Output ----------------
+def plan_rows(induction, standby, ibl):
+    for list_type, trains in (("Induction", induction), ("Standby", standby), ("IBL", ibl)):
+        for t in trains:
+            row = t.as_dict()
+            row["list_type"] = list_type
+            yield row
+
+def write_rows(rows, columns, fmt, out=sys.stdout):
+    rows = list(rows)
+    if fmt == "json":
+        import json
+        json.dump(rows, out, indent=2, default=str)
+        out.write("\n")
+    elif fmt == "csv":
+        import csv
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            score = row.get("score")
+            score = f"{float(score):.2f}" if score is not None else "-"
+            out.write(f"{row['list_type']:<10} Train {row['train_id']:<6} Score: {score}\n")
+
+def parse_time(val):
+    from datetime import datetime
+    return datetime.fromisoformat(val) if val else None
+
+# ---------------- Commands ----------------
+def cmd_induct(args):
+    from fin import induction_pipeline, SNAPSHOT_DIR
+    induction, standby, ibl = induction_pipeline(
+        args.required_count, args.depot, parse_time(args.at), args.strategy,
+        snapshot_dir=args.snapshot_dir or SNAPSHOT_DIR
+    )
+    write_rows(plan_rows(induction, standby, ibl), LIST_COLUMNS, args.format)
+    return 0
+
+def cmd_dry_run(args):
+    from fin import induction_pipeline, generate_induction_lists, SNAPSHOT_DIR
+    snapshot_dir = args.snapshot_dir or SNAPSHOT_DIR
+    target_times = [parse_time(at) for at in args.at or [None]]
+    if len(target_times) == 1:
+        # same run as induct, cleaning plan included, but nothing is published;
+        # deficit rows are derived data, so the target's period may be filled in
+        induction, standby, ibl = induction_pipeline(
+            args.required_count, args.depot, target_times[0], args.strategy,
+            snapshot_dir=snapshot_dir, publish=False
+        )
+        write_rows(plan_rows(induction, standby, ibl), LIST_COLUMNS, args.format)
+        return 0
+
+    # several departures: ranked over one read connection; tonight's
+    # cleaning plan only applies to the next one, so it is not re-planned
+    plans = generate_induction_lists(args.required_count, target_times, args.depot, args.strategy,
+                                     snapshot_dir)
+    if args.format == "text":
+        for target_time, lists in plans.items():
+            print(f"--- {target_time:%Y-%m-%d %H:%M} ---")
+            write_rows(plan_rows(*lists), LIST_COLUMNS, "text")
+        return 0
+    rows = []
+    for target_time, lists in plans.items():
+        for row in plan_rows(*lists):
+            row["target_time"] = target_time
+            rows.append(row)
+    write_rows(rows, ["target_time"] + LIST_COLUMNS, args.format)
+    return 0
+
+def cmd_export(args):
+    from psycopg2.extras import RealDictCursor
+    from db import get_connection
+    conn = get_connection(readonly=True)
+    curr = conn.cursor(cursor_factory=RealDictCursor)
+    curr.execute("""
+        SELECT l.* FROM train_induction_list l
+        JOIN train t ON t.train_id = l.train_id
+        WHERE %(depot_id)s IS NULL OR t.depot_id = %(depot_id)s
+        ORDER BY
+            CASE l.list_type
+                WHEN 'Induction' THEN 1
+                WHEN 'Standby' THEN 2
+                WHEN 'IBL' THEN 3
+                ELSE 4
+            END,
+            l.score DESC NULLS LAST, l.train_id
+    """, {"depot_id": args.depot})
+    rows = curr.fetchall()
+    columns = [d.name for d in curr.description]
+    conn.close()
+    write_rows(rows, columns, args.format)
+    return 0
+
+def cmd_benchmark(args):
+    import time
+    from statistics import median
+    from fin import refresh_branding_deficits, generate_induction_list
+    target_time = parse_time(args.at)
+    refresh_branding_deficits(target_time)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        # no snapshot: writing one per repeat would be timed with the run
+        generate_induction_list(args.required_count, args.depot, target_time, args.strategy,
+                                snapshot_dir=None)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    print(f"runs={len(timings)} min={min(timings):.1f}ms"
+          f" median={median(timings):.1f}ms max={max(timings):.1f}ms")
+    return 0
+
+def cmd_compare(args):
+    from fin import refresh_branding_deficits, compare_strategies
+    target_time = parse_time(args.at)
+    lsn = refresh_branding_deficits(target_time)
+    results = compare_strategies(args.required_count, args.strategy, args.depot, target_time, lsn)
+    rows = []
+    for name, lists in results.items():
+        for row in plan_rows(*lists):
+            row["strategy"] = name
+            rows.append(row)
+    if args.format == "text":
+        for name, lists in results.items():
+            print(f"--- {name} ---")
+            write_rows(plan_rows(*lists), LIST_COLUMNS, "text")
+    else:
+        write_rows(rows, ["strategy"] + LIST_COLUMNS, args.format)
+    return 0
+
+def cmd_horizon(args):
+    from horizon import plan_horizon
+    days = plan_horizon(
+        args.days, args.required_count, args.depot, parse_time(args.at),
+        args.budget, save=not args.no_save
+    )
+    if args.format == "text":
+        for d in days:
+            print(f"{d['service_date']}  Induction: {', '.join(map(str, d['induction'])) or '-'}"
+                  f"  Standby: {len(d['standby'])}  IBL: {len(d['ibl'])}")
+        return 0
+    rows = [
+        {"service_date": d["service_date"], "list_type": list_type, "train_id": tid,
+         "projected_km": round(d["projected_km"][tid], 1)}
+        for d in days
+        for list_type, ids in (("Induction", d["induction"]), ("Standby", d["standby"]), ("IBL", d["ibl"]))
+        for tid in ids
+    ]
+    write_rows(rows, ["service_date", "list_type", "train_id", "projected_km"], args.format)
+    return 0
+
+def cmd_clean(args):
+    from datetime import datetime, timedelta
+    from cleaning import schedule_cleanings
+    cutoff = parse_time(args.at) or datetime.now() + timedelta(hours=8)
+    assignments, summary = schedule_cleanings(cutoff, args.depot, save=not args.no_save)
+    rows = [
+        {"train_id": a["train_id"], "bay_id": a["bay_id"], "crew": a["crew"],
+         "planned_start": a["planned_start"], "planned_end": a["planned_end"], "late": a["late"]}
+        for a in assignments
+    ]
+    if args.format == "text":
+        for r in rows:
+            print(f"Train {r['train_id']:<6} Bay {r['bay_id']:<4} {r['crew']:<10}"
+                  f" {r['planned_start']:%H:%M}-{r['planned_end']:%H:%M}" + ("  LATE" if r["late"] else ""))
+        print(f"jobs={summary['jobs']} makespan={summary['makespan_hours']}h"
+              f" missed={summary['missed']} ready_by_cutoff={summary['ready_by_cutoff']}")
+        return 0
+    write_rows(rows, ["train_id", "bay_id", "crew", "planned_start", "planned_end", "late"], args.format)
+    return 0
+
+def cmd_replay(args):
+    # no database access: everything comes from the snapshot files
+    from snapshot import replay
+    rows = []
+    for path in args.snapshots:
+        meta, results = replay(path, args.strategy, args.required_count)
+        for name, lists in results.items():
+            if args.format == "text":
+                print(f"--- {path} [{name}] target={meta.get('target_time')} ---")
+                write_rows(plan_rows(*lists), LIST_COLUMNS, "text")
+                continue
+            for row in plan_rows(*lists):
+                row["snapshot"] = path
+                row["strategy"] = name
+                rows.append(row)
+    if args.format != "text":
+        write_rows(rows, ["snapshot", "strategy"] + LIST_COLUMNS, args.format)
+    return 0
+
+FORECAST_COLUMNS = [
+    "train_id", "open_cards", "open_hours", "max_severity", "parts_pending_cards",
+    "blocks_service", "forecast_release"
+]
+
+def cmd_forecast(args):
+    from psycopg2.extras import RealDictCursor
+    from db import get_connection
+    from maintenance import rebuild_workloads, with_forecast
+    if args.rebuild:
+        conn = get_connection()
+        curr = conn.cursor()
+        rebuild_workloads(curr)
+        conn.commit()
+        conn.close()
+    conn = get_connection(readonly=True)
+    curr = conn.cursor(cursor_factory=RealDictCursor)
+    curr.execute("""
+        SELECT mw.* FROM train_maintenance_workload mw
+        JOIN train t ON t.train_id = mw.train_id
+        WHERE %(depot_id)s IS NULL OR t.depot_id = %(depot_id)s
+    """, {"depot_id": args.depot})
+    rows = with_forecast(curr.fetchall())
+    conn.close()
+    if args.format == "text":
+        for r in rows:
+            state = f"IBL until {r['forecast_release']:%Y-%m-%d}" if r["blocks_service"] else "deferred"
+            print(f"Train {r['train_id']:<6} cards={r['open_cards']:<3} hours={float(r['open_hours']):<6.1f}"
+                  f" severity={r['max_severity'] or '-':<9} parts={r['parts_pending_cards']:<3} {state}")
+        return 0
+    write_rows(rows, FORECAST_COLUMNS, args.format)
+    return 0
+
+# ---------------- Argument parsing ----------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="KMRL train induction")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p, fmt=True):
+        p.add_argument("--depot", type=int, default=None, help="depot_id (default: whole fleet)")
+        if fmt:
+            p.add_argument("--format", choices=["text", "json", "csv"], default="text")
+
+    def planning(p, many=False, snapshots=True, many_times=False):
+        p.add_argument("--required-count", type=int, default=3)
+        if many_times:
+            p.add_argument("--at", action="append", default=None,
+                           help="target time, ISO format, repeatable (default: now)")
+        else:
+            p.add_argument("--at", default=None, help="target time, ISO format (default: now)")
+        if snapshots:
+            p.add_argument("--snapshot-dir", default=None, help="keep this run's input features there")
+        if many:
+            p.add_argument("--strategy", action="append", default=None,
+                           help="ranking strategy, repeatable (default: all registered)")
+        else:
+            p.add_argument("--strategy", default="weighted_top_n", help="ranking strategy")
+
+    p = sub.add_parser("induct", help="compute and publish the induction list")
+    common(p)
+    planning(p)
+    p.set_defaults(func=cmd_induct)
+
+    p = sub.add_parser("dry-run", help="compute the induction list without saving it")
+    common(p)
+    planning(p, many_times=True)
+    p.set_defaults(func=cmd_dry_run)
+
+    p = sub.add_parser("export", help="print the published induction list")
+    common(p)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("benchmark", help="time repeated induction computations")
+    common(p, fmt=False)
+    planning(p, snapshots=False)
+    p.add_argument("--repeat", type=int, default=10)
+    p.set_defaults(func=cmd_benchmark)
+
+    p = sub.add_parser("horizon", help="plan the next N service days with projected mileage")
+    common(p)
+    p.add_argument("--required-count", type=int, default=3)
+    p.add_argument("--at", default=None, help="first departure, ISO format (default: now)")
+    p.add_argument("--days", type=int, default=7)
+    p.add_argument("--budget", type=float, default=2.0, help="solver time budget in seconds")
+    p.add_argument("--no-save", action="store_true", help="don't update induction_horizon_plan")
+    p.set_defaults(func=cmd_horizon)
+
+    p = sub.add_parser("clean", help="assign pending cleanings to bays and crews before the cutoff")
+    common(p)
+    p.add_argument("--at", default=None, help="induction cutoff, ISO format (default: now + 8h)")
+    p.add_argument("--no-save", action="store_true", help="don't write the schedule back")
+    p.set_defaults(func=cmd_clean)
+
+    p = sub.add_parser("replay", help="re-run strategies against snapshot files, no database")
+    p.add_argument("snapshots", nargs="+", help="snapshot files written with --snapshot-dir")
+    p.add_argument("--format", choices=["text", "json", "csv"], default="text")
+    p.add_argument("--required-count", type=int, default=None, help="default: as recorded in the snapshot")
+    p.add_argument("--strategy", action="append", default=None,
+                   help="ranking strategy, repeatable (default: all registered)")
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("forecast", help="open job-card workload and forecast return to service")
+    common(p)
+    p.add_argument("--rebuild", action="store_true", help="recompute every train from job_card first")
+    p.set_defaults(func=cmd_forecast)
+
+    p = sub.add_parser("compare", help="run several ranking strategies over one fetch")
+    common(p)
+    planning(p, many=True, snapshots=False)
+    p.set_defaults(func=cmd_compare)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command != "replay":  # replay never touches the database
+            from schema import ensure_schema
+            ensure_schema()
+        return args.func(args)
+    except Exception as e:
+        print(f"{args.command} failed: {e}", file=sys.stderr)
+        return 1
+
+# ---------------- Main block ----------------
+if __name__ == "__main__":
+    sys.exit(main())
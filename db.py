@@ -0,0 +1,84 @@
+import os
+import time
+
+# ---------------- Connection settings ----------------
+# Defaults are the development database; override per deployment with the
+# KMRL_DB_* environment variables, or give full DSNs with KMRL_PRIMARY_DSN.
+DB_SETTINGS = {
+    "host": os.environ.get("KMRL_DB_HOST", "localhost"),
+    "dbname": os.environ.get("KMRL_DB_NAME", "KML_dat"),
+    "user": os.environ.get("KMRL_DB_USER", "postgres"),
+    "password": os.environ.get("KMRL_DB_PASSWORD", "02496"),
+    "port": os.environ.get("KMRL_DB_PORT", "5432"),
+}
+
+PRIMARY_DSN = os.environ.get("KMRL_PRIMARY_DSN")
+# streaming replica for read-only work; unset = everything goes to the primary
+REPLICA_DSN = os.environ.get("KMRL_REPLICA_DSN")
+# how long a read waits for the replica to replay a given LSN before
+# falling back to the primary
+REPLICA_WAIT_SECONDS = float(os.environ.get("KMRL_REPLICA_WAIT_SECONDS", "0.5"))
+REPLICA_POLL_SECONDS = 0.02
+
+def _connect(dsn):
+    import psycopg2  # imported here so callers that never connect stay light
+    if dsn:
+        return psycopg2.connect(dsn)
+    return psycopg2.connect(**DB_SETTINGS)
+
+def get_connection(readonly=False, min_lsn=None):
+    """
+    Primary connection by default. readonly=True routes to the replica when
+    one is configured; with min_lsn the replica is only used once it has
+    replayed that LSN (read-your-writes), otherwise the primary is used.
+    """
+    if not readonly or not REPLICA_DSN:
+        return _connect(PRIMARY_DSN)
+
+    try:
+        conn = _connect(REPLICA_DSN)
+    except Exception:
+        return _connect(PRIMARY_DSN)
+
+    if min_lsn and not wait_for_replay(conn, min_lsn):
+        conn.close()
+        return _connect(PRIMARY_DSN)
+    return conn
+
+def wait_for_replay(conn, lsn, timeout=None):
+    timeout = REPLICA_WAIT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    curr = conn.cursor()
+    try:
+        while True:
+            curr.execute("SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn", (lsn,))
+            caught_up = curr.fetchone()[0]
+            if caught_up or time.monotonic() >= deadline:
+                break
+            time.sleep(REPLICA_POLL_SECONDS)
+    except Exception:
+        caught_up = False
+    finally:
+        curr.close()
+    conn.rollback()  # don't leave the probe's transaction open
+    return bool(caught_up)
+
+def current_lsn(conn=None):
+    """
+    WAL position of the primary after a committed write, to hand to a later
+    get_connection(readonly=True, min_lsn=...). None when no replica is
+    configured, since reads then go to the primary anyway.
+    """
+    if not REPLICA_DSN:
+        return None
+    own = conn is None
+    conn = conn or _connect(PRIMARY_DSN)
+    curr = conn.cursor()
+    curr.execute("SELECT pg_current_wal_lsn()::text")
+    lsn = curr.fetchone()[0]
+    curr.close()
+    if own:
+        conn.close()
+    else:
+        conn.commit()
+    return lsn
@@ -1,216 +1,369 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from datetime import datetime
-
-def run_induction(required_count=3):
-    """
-    Perform induction calculation and save to database.
-    """
-    try:
-        create_induction_table()  # ensure table exists
-        induction, standby, ibl = generate_induction_list(required_count)
-        save_lists_to_db(induction, standby, ibl)
-        print("Induction Calculation Completed")
-        return True
-    except Exception as e:
-        print("Induction failed:", e)
-        return False
-
-# ---------------- Database connection ----------------
-def get_connection():
-    return psycopg2.connect(
-        host="localhost",
-        database="KML_dat",
-        user="postgres",
-        password="02496",
-        port="5432"
-    )
-
-# ---------------- Weights (tune these as per KMRL priorities) ----------------
-WEIGHTS = {
-    "fitness": 5.0,
-    "branding": 3.0,
-    "mileage": 2.0,
-    "cleaning": 1.0,
-    "geometry": 1.0
-}
-
-# ---------------- Component functions ----------------
-def fitness_component(train):
-    return 1 if train["fitness_valid"] else 0
-
-def branding_component(train):
-    level = train.get("priority_level")
-    if level == "High":
-        return 1.0
-    elif level == "Medium":
-        return 0.5
-    return 0.0
-
-def mileage_component(train, avg_mileage):
-    if train["cumulative_km"] is None:
-        return 0.0
-    km = float(train["cumulative_km"])
-    deviation = abs(km - float(avg_mileage)) / 1000.0
-    return max(0.0, 1.0 - deviation)
-
-def cleaning_component(train):
-    required = train.get("required", True)
-    status = train.get("cleaning_status", "Scheduled")
-    if required and status != "Done":
-        return 0.0
-    return 1.0
-
-def geometry_component(train):
-    shunts = train.get("estimated_shunt_moves")
-    if shunts is None:
-        return 0.5
-    score = max(0.0, 1.0 - (float(shunts) / 10.0))
-    return score
-
-# ---------------- Main algorithm ----------------
-def generate_induction_list(required_count):
-    conn = get_connection()
-    curr = conn.cursor(cursor_factory=RealDictCursor)
-
-    curr.execute("""
-        SELECT
-            t.train_id,
-            MAX(CASE WHEN fc.status = 'Valid' THEN 1 ELSE 0 END) AS fitness_valid,
-            MAX(CASE WHEN jc.status = 'Open' THEN 1 ELSE 0 END) AS job_card_open,
-            bc.priority_level,
-            ml.cumulative_km,
-            cs.required,
-            cs.status AS cleaning_status,
-            sp.estimated_shunt_moves
-        FROM train t
-        LEFT JOIN fitness_certificate fc ON t.train_id = fc.train_id
-        LEFT JOIN job_card jc ON t.train_id = jc.train_id
-        LEFT JOIN branding_contract bc ON t.train_id = bc.train_id
-        LEFT JOIN (
-                 SELECT DISTINCT ON (train_id)* 
-                 FROM mileage_log
-                 ORDER BY train_id, log_date DESC
-        ) ml ON t.train_id = ml.train_id
-        LEFT JOIN (
-                 SELECT DISTINCT ON (train_id)* 
-                 FROM cleaning_schedule
-                 ORDER BY train_id, deadline DESC
-        ) cs ON t.train_id = cs.train_id
-        LEFT JOIN stabling_position sp ON t.train_id = sp.train_id
-        GROUP BY t.train_id, bc.priority_level, ml.cumulative_km, cs.required, cs.status, sp.estimated_shunt_moves
-    """)
-    
-    trains = curr.fetchall()
-    conn.close()
-
-    candidates, ibl = [], []
-
-    # average mileage
-    mileage_values = [float(t["cumulative_km"]) for t in trains if t["cumulative_km"] is not None]
-    avg_mileage = sum(mileage_values) / len(mileage_values) if mileage_values else 0.0
-
-    for t in trains:
-        if not t["fitness_valid"] or t["job_card_open"]:
-            ibl.append(t)
-        else:
-            fitness = fitness_component(t)
-            branding = branding_component(t)
-            mileage  = mileage_component(t, avg_mileage)
-            cleaning = cleaning_component(t)
-            geometry = geometry_component(t)
-            score = (
-                WEIGHTS["fitness"]  * fitness +
-                WEIGHTS["branding"] * branding +
-                WEIGHTS["mileage"]  * mileage +
-                WEIGHTS["cleaning"] * cleaning +
-                WEIGHTS["geometry"] * geometry
-            )
-            t["score"] = score
-            candidates.append(t)
-
-    ranked = sorted(candidates, key=lambda x: x["score"], reverse=True)
-    induction = ranked[:required_count]
-    standby = ranked[required_count:]
-
-    return induction, standby, ibl
-
-# ---------------- Database storage ----------------
-def create_induction_table():
-    conn = get_connection()
-    curr = conn.cursor()
-    curr.execute("""
-        CREATE TABLE IF NOT EXISTS train_induction_list (
-            id SERIAL PRIMARY KEY,
-            train_id INT NOT NULL,
-            list_type VARCHAR(20) NOT NULL,
-            score NUMERIC,
-            fitness_valid BOOLEAN,
-            job_card_open BOOLEAN,
-            branding_level VARCHAR(20),
-            cumulative_km NUMERIC,
-            cleaning_required BOOLEAN,
-            cleaning_status VARCHAR(20),
-            estimated_shunt_moves NUMERIC,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    curr.close()
-    conn.close()
-
-def save_lists_to_db(induction, standby, ibl):
-    conn = get_connection()
-    curr = conn.cursor()
-    # clear old data
-    curr.execute("DELETE FROM train_induction_list")
-    conn.commit()
-
-    def insert_train(t, list_type):
-        curr.execute("""
-            INSERT INTO train_induction_list (
-                train_id, list_type, score, fitness_valid, job_card_open,
-                branding_level, cumulative_km, cleaning_required, cleaning_status,
-                estimated_shunt_moves
-            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """, (
-            t["train_id"],
-            list_type,
-            t.get("score"),
-            bool(t.get("fitness_valid")),   # CAST integer to boolean
-            bool(t.get("job_card_open")),   # CAST integer to boolean
-            t.get("priority_level"),
-            t.get("cumulative_km"),
-            bool(t.get("required")),        # CAST integer/None to boolean
-            t.get("cleaning_status"),
-            t.get("estimated_shunt_moves")
-        ))
-
-    for t in induction:
-        insert_train(t, "Induction")
-    for t in standby:
-        insert_train(t, "Standby")
-    for t in ibl:
-        insert_train(t, "IBL")
-
-    conn.commit()
-    curr.close()
-    conn.close()
-
-# ---------------- Main block ----------------
-if __name__ == "__main__":
-    create_induction_table()
-    induction, standby, ibl = generate_induction_list(required_count=3)
-    save_lists_to_db(induction, standby, ibl)
-
-    print("\n--- Induction List ---")
-    for t in induction:
-        print(f"Train {t['train_id']} | Score: {t['score']:.2f}")
-
-    print("\n--- Standby List ---")
-    for t in standby:
-        print(f"Train {t['train_id']} | Score: {t['score']:.2f}")
-
-    print("\n--- IBL (Maintenance) ---")
-    for t in ibl:
-        print(f"Train {t['train_id']} | Reason: Fitness={t['fitness_valid']} JobCardOpen={t['job_card_open']}")
+import os
+from datetime import datetime
+from branding import refresh_due_deficits
+from cleaning import schedule_cleanings, has_cleaning_resources
+from db import get_connection, current_lsn
+from records import TrainRecord
+from schema import ensure_schema
+from scoring import run_strategy, run_strategies
+from yard import apply_shunt_moves
+
+# directory for per-run input snapshots (see snapshot.py); unset = don't keep them
+SNAPSHOT_DIR = os.environ.get("KMRL_SNAPSHOT_DIR")
+
+def run_induction(required_count=3, depot_id=None, target_time=None, strategy="weighted_top_n"):
+    """
+    Perform induction calculation and save to database.
+    target_time is the departure the plan is for (default: now);
+    strategy is a name registered in scoring.STRATEGIES.
+    """
+    try:
+        induction_pipeline(required_count, depot_id, target_time, strategy)
+        print("Induction Calculation Completed")
+        return True
+    except Exception as e:
+        print("Induction failed:", e)
+        return False
+
+class IncompletePlan(Exception):
+    """
+    The computed plan is not fit to publish; the previous one is kept.
+    """
+
+def check_complete(induction, standby, ibl, required_count):
+    """
+    Return a reason string if the computed plan should not be published.
+    """
+    if not (induction or standby or ibl):
+        return "no trains fetched"
+    if len(induction) < required_count:
+        return f"only {len(induction)} eligible trains for {required_count} slots"
+    return None
+
+def induction_pipeline(required_count=3, depot_id=None, target_time=None, strategy="weighted_top_n",
+                       snapshot_dir=SNAPSHOT_DIR, require_complete=False, publish=True):
+    """
+    The one induction run shared by run_induction, `cli.py induct`,
+    `cli.py dry-run` and the scheduler: schema, cleaning plan, branding
+    deficits, ranking, publish.
+    With require_complete an unusable plan raises IncompletePlan instead of
+    being published. publish=False computes the same plan without writing
+    the cleaning plan or the lists; its cleanings are applied in memory.
+    Returns (induction, standby, ibl).
+    """
+    ensure_schema()
+    # one fixed departure for every step: cleanings only count as ready for
+    # the departure they were planned for
+    target_time = target_time or datetime.now()
+    # bays and crews first, so cleanings finishing before departure score as done
+    cleaning_plan = None
+    if has_cleaning_resources(depot_id):
+        assignments, _ = schedule_cleanings(target_time, depot_id, save=publish)
+        if not publish:
+            cleaning_plan = cleaning_readiness(assignments, target_time)
+    lsn = refresh_branding_deficits(target_time)
+    induction, standby, ibl = generate_induction_list(
+        required_count, depot_id, target_time, strategy, lsn, snapshot_dir, cleaning_plan
+    )
+    if require_complete:
+        reason = check_complete(induction, standby, ibl, required_count)
+        if reason:
+            raise IncompletePlan(reason)
+    if publish:
+        save_lists_to_db(induction, standby, ibl, depot_id)
+    return induction, standby, ibl
+
+def cleaning_readiness(assignments, cutoff):
+    """
+    {train_id: cleaning_ready} for an unsaved cleaning plan, the same test
+    FEATURE_QUERY applies to a saved one: every cleaning planned for the
+    train ends by the cutoff.
+    """
+    ready = {}
+    for a in assignments:
+        ready[a["train_id"]] = ready.get(a["train_id"], True) and a["planned_end"] <= cutoff
+    return ready
+
+# ---------------- Main algorithm ----------------
+# Feature query evaluated "as of" a target time: only certificates and
+# branding contracts whose validity range contains the target count, and only
+# mileage and cleaning rows dated up to it; the branding deficit is the row for
+# the exposure period containing the target. The range predicates match the
+# GiST expression indexes in create_validity_indexes() so each lookup is an
+# index probe. Job cards come from the per-train workload summary kept by
+# maintenance.py: job_card_open means the train has open cards, blocks_service
+# that they are serious enough to keep it out of service. A train with several
+# active contracts takes the highest priority among them, so each train is
+# one row.
+FEATURE_QUERY = """
+    SELECT
+        t.train_id,
+        MAX(CASE WHEN fc.status = 'Valid' THEN 1 ELSE 0 END) AS fitness_valid,
+        COALESCE(mw.open_cards > 0, FALSE) AS job_card_open,
+        CASE MAX(CASE bc.priority_level WHEN 'High' THEN 3 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 1 END)
+            WHEN 3 THEN 'High' WHEN 2 THEN 'Medium' WHEN 1 THEN 'Low'
+        END AS priority_level,
+        ml.cumulative_km,
+        cs.required,
+        cs.status AS cleaning_status,
+        sp.estimated_shunt_moves,
+        bd.hours_owed AS branding_hours_owed,
+        bd.hours_required AS branding_hours_required,
+        COALESCE(cs.planned_for = %(at)s AND cs.planned_end BETWEEN cs.planned_at AND cs.planned_for,
+                 FALSE) AS cleaning_ready,
+        sp.bay_id,
+        sp.bay_position_index,
+        sp.distance_to_exit_meters,
+        COALESCE(sp.blocked, FALSE) AS blocked,
+        COALESCE(mw.blocks_service, FALSE) AS blocks_service,
+        t.depot_id
+    FROM train t
+    LEFT JOIN fitness_certificate fc ON t.train_id = fc.train_id
+         AND validity_range(fc.valid_from, fc.valid_to) @> %(at)s::timestamp
+    LEFT JOIN train_maintenance_workload mw ON t.train_id = mw.train_id
+    LEFT JOIN branding_contract bc ON t.train_id = bc.train_id
+         AND validity_range(bc.start_date, bc.end_date) @> %(at)s::timestamp
+    LEFT JOIN (
+             SELECT DISTINCT ON (train_id)*
+             FROM mileage_log
+             WHERE log_date <= %(at)s
+             ORDER BY train_id, log_date DESC
+    ) ml ON t.train_id = ml.train_id
+    LEFT JOIN (
+             SELECT DISTINCT ON (train_id)*
+             FROM cleaning_schedule
+             WHERE deadline IS NULL OR deadline <= %(at)s
+             ORDER BY train_id, deadline DESC NULLS LAST
+    ) cs ON t.train_id = cs.train_id
+    LEFT JOIN stabling_position sp ON t.train_id = sp.train_id
+    LEFT JOIN LATERAL (
+             SELECT hours_owed, hours_required
+             FROM branding_exposure_deficit d
+             WHERE d.train_id = t.train_id
+               AND d.window_start <= %(at)s
+               AND (d.window_end IS NULL OR d.window_end > %(at)s)
+             ORDER BY d.window_start DESC
+             LIMIT 1
+    ) bd ON TRUE
+    WHERE %(depot_id)s IS NULL OR t.depot_id = %(depot_id)s
+    GROUP BY t.train_id, t.depot_id, mw.open_cards, mw.blocks_service, ml.cumulative_km, cs.required, cs.status, sp.estimated_shunt_moves,
+             bd.hours_owed, bd.hours_required, cs.planned_end, cs.planned_at, cs.planned_for,
+             sp.bay_id, sp.bay_position_index, sp.distance_to_exit_meters, sp.blocked
+"""
+
+def fetch_trains(curr, target_time=None, depot_id=None):
+    # depot_id=None plans the whole fleet; target_time=None means now
+    curr.execute(FEATURE_QUERY, {
+        "at": target_time or datetime.now(),
+        "depot_id": depot_id
+    })
+    trains = [TrainRecord.from_row(row) for row in curr.fetchall()]
+    return apply_shunt_moves(trains)
+
+def rank_trains(trains, required_count, strategy="weighted_top_n"):
+    return run_strategy(strategy, trains, required_count)
+
+def fetch_snapshot(depot_id=None, target_time=None, min_lsn=None):
+    ensure_schema()
+    # read-only: served by the replica when one is configured
+    conn = get_connection(readonly=True, min_lsn=min_lsn)
+    curr = conn.cursor()
+    trains = fetch_trains(curr, target_time, depot_id)
+    conn.close()
+    return trains
+
+def generate_induction_list(required_count, depot_id=None, target_time=None, strategy="weighted_top_n",
+                            min_lsn=None, snapshot_dir=SNAPSHOT_DIR, cleaning_plan=None):
+    # cleaning_plan: {train_id: cleaning_ready} overriding the stored plan
+    trains = fetch_snapshot(depot_id, target_time, min_lsn)
+    if cleaning_plan:
+        for t in trains:
+            if t.train_id in cleaning_plan:
+                t.cleaning_ready = cleaning_plan[t.train_id]
+    if snapshot_dir:
+        save_snapshot(snapshot_dir, trains, required_count, depot_id, target_time, strategy)
+    return rank_trains(trains, required_count, strategy)
+
+def save_snapshot(directory, trains, required_count, depot_id=None, target_time=None, strategy=None):
+    """
+    Persist the exact input features of a run so it can be replayed offline.
+    """
+    from snapshot import write_snapshot, snapshot_path
+    created_at = datetime.now()
+    target_time = target_time or created_at
+    os.makedirs(directory, exist_ok=True)
+    return write_snapshot(snapshot_path(directory, target_time, depot_id, created_at), trains, {
+        "target_time": target_time.isoformat(),
+        "depot_id": depot_id,
+        "required_count": required_count,
+        "strategy": strategy,
+        "created_at": created_at.isoformat()
+    })
+
+def compare_strategies(required_count, strategies=None, depot_id=None, target_time=None, min_lsn=None):
+    """
+    Run several ranking strategies (default: all registered) over one fetch.
+    Returns {strategy: (induction, standby, ibl)}.
+    """
+    trains = fetch_snapshot(depot_id, target_time, min_lsn)
+    return run_strategies(trains, required_count, strategies)
+
+def generate_induction_lists(required_count, target_times, depot_id=None, strategy="weighted_top_n",
+                             snapshot_dir=SNAPSHOT_DIR):
+    """
+    Compute induction for several target times (e.g. the next week of
+    05:00 departures): one primary connection for the deficits, one read
+    connection for the fetches.
+    Returns {target_time: (induction, standby, ibl)}.
+    """
+    ensure_schema()
+    # each date reads the branding deficit of its own exposure period
+    lsn = refresh_branding_deficits(*target_times)
+    conn = get_connection(readonly=True, min_lsn=lsn)
+    curr = conn.cursor()
+    plans = {}
+    for target_time in target_times:
+        trains = fetch_trains(curr, target_time, depot_id)
+        if snapshot_dir:
+            save_snapshot(snapshot_dir, trains, required_count, depot_id, target_time, strategy)
+        plans[target_time] = rank_trains(trains, required_count, strategy)
+    conn.close()
+
+    return plans
+
+# ---------------- Database storage ----------------
+def create_induction_table(curr):
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS train_induction_list (
+            id SERIAL PRIMARY KEY,
+            train_id INT NOT NULL,
+            list_type VARCHAR(20) NOT NULL,
+            score NUMERIC,
+            fitness_valid BOOLEAN,
+            job_card_open BOOLEAN,
+            branding_level VARCHAR(20),
+            cumulative_km NUMERIC,
+            cleaning_required BOOLEAN,
+            cleaning_status VARCHAR(20),
+            estimated_shunt_moves NUMERIC,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def refresh_branding_deficits(*target_times):
+    """
+    Roll branding exposure windows forward to each target time (default:
+    now) so the deficit rows read by FEATURE_QUERY are current, in one
+    transaction. Returns the primary's LSN for a following replica read.
+    """
+    conn = get_connection()
+    curr = conn.cursor()
+    for target_time in target_times or (None,):
+        refresh_due_deficits(curr, target_time)
+    conn.commit()
+    curr.close()
+    lsn = current_lsn(conn)
+    conn.close()
+    return lsn
+
+def create_validity_indexes(curr):
+    """
+    validity_range() and the range indexes backing the "valid at T" lookups
+    in FEATURE_QUERY. Run once, as a schema migration.
+
+    One rule for end dates everywhere: a record is valid from valid_from up
+    to valid_to; a DATE end means the whole of that day. A record whose
+    start is after its end is never valid (the range is NULL) instead of
+    making tsrange() raise and fail every run.
+    """
+    curr.execute("""
+        CREATE OR REPLACE FUNCTION validity_range(valid_from timestamp, valid_to timestamp)
+        RETURNS tsrange LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE WHEN valid_from > valid_to THEN NULL
+                        ELSE tsrange(valid_from, valid_to, '[)') END
+        $$
+    """)
+    curr.execute("""
+        CREATE OR REPLACE FUNCTION validity_range(valid_from date, valid_to date)
+        RETURNS tsrange LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE WHEN valid_from > valid_to THEN NULL
+                        ELSE tsrange(valid_from::timestamp, (valid_to + 1)::timestamp, '[)') END
+        $$
+    """)
+    curr.execute("""
+        CREATE INDEX IF NOT EXISTS idx_fitness_certificate_validity
+        ON fitness_certificate USING gist (validity_range(valid_from, valid_to))
+    """)
+    curr.execute("""
+        CREATE INDEX IF NOT EXISTS idx_branding_contract_validity
+        ON branding_contract USING gist (validity_range(start_date, end_date))
+    """)
+    curr.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mileage_log_train_date
+        ON mileage_log (train_id, log_date DESC)
+    """)
+    curr.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cleaning_schedule_train_deadline
+        ON cleaning_schedule (train_id, deadline DESC NULLS LAST)
+    """)
+
+def save_lists_to_db(induction, standby, ibl, depot_id=None):
+    conn = get_connection()
+    curr = conn.cursor()
+    # clear old data; delete and inserts share one transaction so readers
+    # keep seeing the previous plan until the new one is complete
+    if depot_id is None:
+        curr.execute("DELETE FROM train_induction_list")
+    else:
+        curr.execute("""
+            DELETE FROM train_induction_list
+            WHERE train_id IN (SELECT train_id FROM train WHERE depot_id = %s)
+        """, (depot_id,))
+
+    def insert_train(t, list_type):
+        curr.execute("""
+            INSERT INTO train_induction_list (
+                train_id, list_type, score, fitness_valid, job_card_open,
+                branding_level, cumulative_km, cleaning_required, cleaning_status,
+                estimated_shunt_moves
+            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        """, (
+            t.train_id,
+            list_type,
+            t.score,
+            t.fitness_valid,
+            t.job_card_open,
+            t.priority_level,
+            t.cumulative_km,
+            bool(t.required),               # None (no cleaning row) -> False
+            t.cleaning_status,
+            t.effective_shunt_moves()
+        ))
+
+    for t in induction:
+        insert_train(t, "Induction")
+    for t in standby:
+        insert_train(t, "Standby")
+    for t in ibl:
+        insert_train(t, "IBL")
+
+    conn.commit()
+    curr.close()
+    conn.close()
+
+# ---------------- Main block ----------------
+if __name__ == "__main__":
+    induction, standby, ibl = induction_pipeline(required_count=3)
+
+    print("\n--- Induction List ---")
+    for t in induction:
+        print(f"Train {t.train_id} | Score: {t.score:.2f}")
+
+    print("\n--- Standby List ---")
+    for t in standby:
+        print(f"Train {t.train_id} | Score: {t.score:.2f}")
+
+    print("\n--- IBL (Maintenance) ---")
+    for t in ibl:
+        print(f"Train {t.train_id} | Reason: Fitness={t.fitness_valid} JobCardOpen={t.job_card_open}"
+              f" BlocksService={t.blocks_service}")
@@ -0,0 +1,274 @@
+"""
+Rolling-horizon induction planner.
+
+Plans the next N service days in one computation. Each train's mileage is
+projected forward with its recent average km_run, certificates stop a train
+from being planned after they expire, and a train whose open job cards keep
+it in IBL stays there until the release projected from its remaining work
+(maintenance.py). Plans are built greedily day by day and then improved by
+swap local search until the time budget runs out.
+
+The plan is stored in induction_horizon_plan; the next night's run starts
+from the still-valid part of that plan and only fills in what changed.
+"""
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from db import get_connection
+from maintenance import release_days
+from fin import fetch_trains
+from schema import ensure_schema
+from scoring import WEIGHTS, fitness_component, branding_component, cleaning_component, geometry_component
+
+MILEAGE_HISTORY_DAYS = 14         # mileage_log rows used for km/day
+HORIZON_BUDGET_SECONDS = 2.0
+MAX_STALLED_SWAPS = 5000          # stop local search early once it stops improving
+
+HORIZON_QUERY = """
+    SELECT
+        t.train_id,
+        (SELECT AVG(r.km_run) FROM (
+             SELECT ml.km_run FROM mileage_log ml
+             WHERE ml.train_id = t.train_id AND ml.log_date <= %(at)s
+             ORDER BY ml.log_date DESC
+             LIMIT %(history)s
+        ) r) AS km_per_day,
+        (SELECT CASE WHEN bool_or(upper_inf(v.validity)) THEN NULL ELSE MAX(upper(v.validity)) END
+         FROM (SELECT validity_range(fc.valid_from, fc.valid_to) AS validity
+               FROM fitness_certificate fc
+               WHERE fc.train_id = t.train_id AND fc.status = 'Valid'
+                 AND validity_range(fc.valid_from, fc.valid_to) @> %(at)s::timestamp) v
+        ) AS fit_until,
+        COALESCE(mw.blocks_service, FALSE) AS blocks_service,
+        mw.open_hours,
+        mw.parts_pending_cards
+    FROM train t
+    LEFT JOIN train_maintenance_workload mw ON t.train_id = mw.train_id
+    WHERE %(depot_id)s IS NULL OR t.depot_id = %(depot_id)s
+"""
+
+# ---------------- Model ----------------
+class HorizonTrain:
+    __slots__ = ("train_id", "static_score", "km", "km_per_day", "fit_until", "available_from", "eligible")
+
+    def available_on(self, day, departure):
+        if not self.eligible or day < self.available_from:
+            return False
+        # fit_until is the exclusive end of validity_range(), same rule as induction
+        return self.fit_until is None or departure < self.fit_until
+
+def build_model(records, extras, fleet_km_per_day):
+    """
+    Combine the day-0 snapshot with the horizon query into HorizonTrains.
+    """
+    model = {}
+    for t in records:
+        km_per_day, fit_until, blocked, open_hours, parts_pending = extras.get(
+            t.train_id, (None, None, False, None, None))
+        h = HorizonTrain()
+        h.train_id = t.train_id
+        # mileage is handled by the planner; the rest is fixed over the horizon
+        h.static_score = (
+            WEIGHTS["fitness"]  * fitness_component(t) +
+            WEIGHTS["branding"] * branding_component(t) +
+            WEIGHTS["cleaning"] * cleaning_component(t) +
+            WEIGHTS["geometry"] * geometry_component(t)
+        )
+        h.km = t.cumulative_km or 0.0
+        h.km_per_day = float(km_per_day) if km_per_day is not None else fleet_km_per_day
+        h.fit_until = fit_until
+        h.available_from = release_days(open_hours, parts_pending) if blocked else 0
+        # a train without a valid certificate today cannot come back inside the horizon
+        h.eligible = t.fitness_valid
+        model[t.train_id] = h
+    return model
+
+def mileage_balance(km, avg_km):
+    # 1 for trains well below the fleet average, 0 well above it
+    return max(0.0, min(1.0, 0.5 + (avg_km - km) / 2000.0))
+
+# ---------------- Planning ----------------
+def greedy_plan(model, departures, required_count, warm=None):
+    """
+    Day-by-day plan. warm maps day index -> train_ids to keep if still
+    available (the previous night's plan). Returns a list of induction sets.
+    """
+    km = {tid: h.km for tid, h in model.items()}
+    plan = []
+    for day, departure in enumerate(departures):
+        available = [h for h in model.values() if h.available_on(day, departure)]
+        avg_km = sum(km.values()) / len(km) if km else 0.0
+
+        chosen = [tid for tid in (warm or {}).get(day, ()) if model.get(tid) and model[tid].available_on(day, departure)]
+        chosen = chosen[:required_count]
+        rest = sorted(
+            (h for h in available if h.train_id not in chosen),
+            key=lambda h: h.static_score + WEIGHTS["mileage"] * mileage_balance(km[h.train_id], avg_km),
+            reverse=True
+        )
+        chosen += [h.train_id for h in rest[:required_count - len(chosen)]]
+
+        for tid in chosen:
+            km[tid] += model[tid].km_per_day
+        plan.append(set(chosen))
+    return plan
+
+def final_km(model, plan):
+    km = {tid: h.km for tid, h in model.items()}
+    for inducted in plan:
+        for tid in inducted:
+            km[tid] += model[tid].km_per_day
+    return km
+
+def objective(model, plan, km):
+    """
+    Static score of every induction minus a penalty on the spread of
+    projected mileage at the end of the horizon.
+    """
+    values = list(km.values())
+    if values:
+        mean = sum(values) / len(values)
+        spread = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+    else:
+        spread = 0.0
+    static = sum(model[tid].static_score for inducted in plan for tid in inducted)
+    return static - WEIGHTS["mileage"] * len(plan) * spread / 1000.0
+
+def improve(model, departures, plan, deadline, seed=0):
+    """
+    Swap local search: replace one inducted train by an available standby
+    train on some day whenever that raises the objective.
+    """
+    rng = random.Random(seed)
+    km = final_km(model, plan)
+    best = objective(model, plan, km)
+    options = [
+        [h.train_id for h in model.values() if h.available_on(day, departure)]
+        for day, departure in enumerate(departures)
+    ]
+
+    stalled = 0
+    while plan and stalled < MAX_STALLED_SWAPS and time.perf_counter() < deadline:
+        stalled += 1
+        day = rng.randrange(len(plan))
+        spare = [tid for tid in options[day] if tid not in plan[day]]
+        if not plan[day] or not spare:
+            continue
+        out_id = rng.choice(sorted(plan[day]))
+        in_id = rng.choice(spare)
+
+        km[out_id] -= model[out_id].km_per_day
+        km[in_id] += model[in_id].km_per_day
+        plan[day].remove(out_id)
+        plan[day].add(in_id)
+        value = objective(model, plan, km)
+        if value > best:
+            best = value
+            stalled = 0
+            continue
+        # revert
+        plan[day].remove(in_id)
+        plan[day].add(out_id)
+        km[in_id] -= model[in_id].km_per_day
+        km[out_id] += model[out_id].km_per_day
+    return plan
+
+# ---------------- Storage (horizon cache) ----------------
+def create_horizon_table(curr):
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS induction_horizon_plan (
+            id SERIAL PRIMARY KEY,
+            depot_id INT,
+            service_date DATE NOT NULL,
+            train_id INT NOT NULL,
+            list_type VARCHAR(20) NOT NULL,
+            projected_km NUMERIC,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def load_previous_plan(curr, depot_id, departures):
+    """
+    Previously planned inductions for the given departures, as warm start.
+    """
+    index = {d.date(): day for day, d in enumerate(departures)}
+    curr.execute("""
+        SELECT service_date, train_id FROM induction_horizon_plan
+        WHERE depot_id IS NOT DISTINCT FROM %s
+          AND list_type = 'Induction'
+          AND service_date >= %s
+    """, (depot_id, departures[0].date()))
+    warm = {}
+    for service_date, train_id in curr.fetchall():
+        if service_date in index:
+            warm.setdefault(index[service_date], []).append(train_id)
+    return warm
+
+def save_plan(curr, depot_id, days):
+    curr.execute("""
+        DELETE FROM induction_horizon_plan
+        WHERE depot_id IS NOT DISTINCT FROM %s AND service_date >= %s
+    """, (depot_id, days[0]["service_date"]))
+    for d in days:
+        for list_type, ids in (("Induction", d["induction"]), ("Standby", d["standby"]), ("IBL", d["ibl"])):
+            for tid in ids:
+                curr.execute("""
+                    INSERT INTO induction_horizon_plan (depot_id, service_date, train_id, list_type, projected_km)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (depot_id, d["service_date"], tid, list_type, d["projected_km"][tid]))
+
+# ---------------- Entry point ----------------
+def plan_horizon(days=7, required_count=3, depot_id=None, start=None,
+                 budget_seconds=HORIZON_BUDGET_SECONDS, save=True):
+    """
+    Plan the next `days` departures starting at `start` (default: now).
+    Returns a list of dicts, one per service day:
+    {service_date, induction, standby, ibl, projected_km}.
+    """
+    deadline = time.perf_counter() + budget_seconds
+    start = start or datetime.now()
+    departures = [start + timedelta(days=d) for d in range(days)]
+
+    ensure_schema()
+    conn = get_connection()
+    curr = conn.cursor()
+    records = fetch_trains(curr, start, depot_id)
+    curr.execute(HORIZON_QUERY, {
+        "at": start,
+        "depot_id": depot_id,
+        "history": MILEAGE_HISTORY_DAYS
+    })
+    extras = {row[0]: row[1:] for row in curr.fetchall()}
+    known = [float(v[0]) for v in extras.values() if v[0] is not None]
+    fleet_km_per_day = sum(known) / len(known) if known else 0.0
+
+    model = build_model(records, extras, fleet_km_per_day)
+    warm = load_previous_plan(curr, depot_id, departures)
+
+    plan = greedy_plan(model, departures, required_count, warm)
+    plan = improve(model, departures, plan, deadline)
+
+    # walk the final plan to report per-day projected mileage
+    km = {tid: h.km for tid, h in model.items()}
+    result = []
+    for day, departure in enumerate(departures):
+        inducted = plan[day]
+        available = [tid for tid, h in model.items() if h.available_on(day, departure)]
+        result.append({
+            "service_date": departure.date(),
+            "induction": sorted(inducted, key=lambda tid: -model[tid].static_score),
+            "standby": sorted((tid for tid in available if tid not in inducted), key=lambda tid: -model[tid].static_score),
+            "ibl": sorted(tid for tid in model if tid not in available),
+            "projected_km": dict(km)
+        })
+        for tid in inducted:
+            km[tid] += model[tid].km_per_day
+
+    if save and result:
+        save_plan(curr, depot_id, result)
+    conn.commit()
+    curr.close()
+    conn.close()
+    return result
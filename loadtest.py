@@ -0,0 +1,223 @@
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+# ---------------- User mixes (relative weights per operation) ----------------
+# operators: depot staff entering trains; displays: wall screens polling the
+# induction list; mixed: both at once plus the occasional manual induction run
+MIXES = {
+    "operators": {"save_single": 5, "save_bulk": 1, "depots": 3, "induction": 1, "run": 0},
+    "displays":  {"save_single": 0, "save_bulk": 0, "depots": 1, "induction": 9, "run": 0},
+    "mixed":     {"save_single": 3, "save_bulk": 1, "depots": 2, "induction": 6, "run": 0.2},
+}
+
+# ---------------- Request payloads ----------------
+def train_payload(rng, depot_id, bulk=False):
+    now = datetime.now()
+    n = 10 if bulk else 1
+    return {
+        "train": {
+            "train_number": f"LT-{rng.randrange(10**8):08d}",
+            "depot_id": depot_id,
+            "status": "Available",
+            "in_service": True
+        },
+        "fitness_certificate": [{
+            "department": dept,
+            "status": "Valid",
+            "valid_from": (now - timedelta(days=30)).isoformat(),
+            "valid_to": (now + timedelta(days=30)).isoformat()
+        } for dept in ("Rolling Stock", "Signalling", "Telecom")[:3 if bulk else 1]],
+        "job_card": [{
+            "severity": "Low",
+            "description": f"load test card {i}",
+            "status": "Closed",
+            "estimated_hours": 1
+        } for i in range(n)],
+        "branding_contract": [{
+            "advertiser_name": "Load Test Ads",
+            "priority_level": rng.choice(["High", "Medium", "Low"]),
+            "exposure_required_hours": 8,
+            "window_type": "Daily",
+            "start_date": (now - timedelta(days=1)).isoformat(),
+            "end_date": (now + timedelta(days=30)).isoformat()
+        }],
+        "mileage_log": [{
+            "log_date": (now - timedelta(days=i)).isoformat(),
+            "km_run": 300,
+            "cumulative_km": 50000 - 300 * i
+        } for i in range(n * 3)],
+        "cleaning_schedule": [{
+            "cleaning_type": "Interior",
+            "duration_hours": 2,
+            "deadline": (now + timedelta(hours=8)).isoformat(),
+            "status": "Scheduled"
+        }],
+        "stabling_position": [{
+            "bay_id": rng.randrange(1, 9),
+            "bay_position_index": rng.randrange(0, 3),
+            "distance_to_exit_meters": rng.randrange(20, 400),
+            "estimated_shunt_moves": rng.randrange(0, 4)
+        }]
+    }
+
+def build_request(op, base_url, rng, depot_id):
+    """
+    Return (method, url, json_body) for one operation.
+    """
+    if op == "save_single":
+        return "POST", base_url + "/api/trains/save", train_payload(rng, depot_id)
+    if op == "save_bulk":
+        return "POST", base_url + "/api/trains/save", train_payload(rng, depot_id, bulk=True)
+    if op == "depots":
+        return "GET", base_url + "/api/depots", None
+    if op == "induction":
+        return "GET", base_url + "/induction", None
+    if op == "run":
+        return "POST", base_url + "/api/induction/run", {}
+    raise ValueError(f"Unknown operation: {op}")
+
+def send(method, url, body, timeout):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            # HTML routes report database errors as a 200 "Error ..." page
+            return 200 <= resp.status < 300 and not body.startswith(b"Error")
+    except Exception:
+        return False
+
+# ---------------- Load generation ----------------
+def run_load(base_url, mix, users, duration, depot_id=1, seed=0, timeout=30.0):
+    """
+    Run `users` concurrent virtual users for `duration` seconds.
+    Returns a list of (op, latency_seconds, ok) samples.
+    """
+    ops = [op for op, w in MIXES[mix].items() if w > 0]
+    weights = [MIXES[mix][op] for op in ops]
+    samples = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def user(n):
+        rng = random.Random(seed + n)
+        local = []
+        while time.perf_counter() < stop_at:
+            op = rng.choices(ops, weights)[0]
+            method, url, body = build_request(op, base_url, rng, depot_id)
+            start = time.perf_counter()
+            ok = send(method, url, body, timeout)
+            local.append((op, time.perf_counter() - start, ok))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(users)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return samples
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+def summarize(samples, duration):
+    """
+    Per-operation and overall throughput, latency percentiles (ms) and error rate.
+    """
+    groups = {}
+    for op, latency, ok in samples:
+        groups.setdefault(op, []).append((latency, ok))
+    groups["ALL"] = [(latency, ok) for _, latency, ok in samples]
+
+    report = {}
+    for op, rows in groups.items():
+        latencies = sorted(latency for latency, _ in rows)
+        errors = sum(1 for _, ok in rows if not ok)
+        report[op] = {
+            "requests": len(rows),
+            "throughput_rps": round(len(rows) / duration, 2) if duration else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0
+        }
+    return report
+
+def print_report(report):
+    print(f"{'operation':<12} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for op in sorted(report, key=lambda k: (k == "ALL", k)):
+        r = report[op]
+        print(f"{op:<12} {r['requests']:>7} {r['throughput_rps']:>8} {r['p50_ms']:>8}"
+              f" {r['p95_ms']:>8} {r['p99_ms']:>8} {r['error_rate']:>7.2%}")
+
+# ---------------- Local stack ----------------
+def start_gunicorn(host, port, workers, db_name=None):
+    # db.py reads KMRL_DB_* at import, so the workers pick the database up from here
+    env = dict(os.environ)
+    if db_name:
+        env["KMRL_DB_NAME"] = db_name
+    proc = subprocess.Popen([
+        "gunicorn", "-w", str(workers), "-b", f"{host}:{port}", "app:app"
+    ], env=env)
+    base_url = f"http://{host}:{port}"
+    for _ in range(100):
+        if send("GET", base_url + "/", None, timeout=1.0):
+            return proc
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not come up")
+
+# ---------------- Main block ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test for the KMRL Flask app")
+    parser.add_argument("--url", default=None, help="target base URL (default: start a local gunicorn)")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--depot-id", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers for the local stack")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db-name", default=None,
+                        help="database for the local stack (default: KMRL_DB_NAME / db.py)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        proc = start_gunicorn("127.0.0.1", args.port, args.workers, args.db_name)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        # throughput over the measured wall time: in-flight requests at the
+        # deadline still finish, so the run lasts longer than --duration
+        started = time.perf_counter()
+        samples = run_load(base_url, args.mix, args.users, args.duration, args.depot_id, args.seed)
+        elapsed = time.perf_counter() - started
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    report = summarize(samples, elapsed)
+    if args.json:
+        print(json.dumps({"mix": args.mix, "users": args.users, "duration": args.duration,
+                          "elapsed": round(elapsed, 2), "report": report}, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,147 @@
+"""
+Per-train maintenance workload and IBL release forecast.
+
+train_maintenance_workload keeps one row per train summarising its open job
+cards: count, remaining estimated hours, worst severity and parts-pending
+cards, plus whether they keep the train out of service. Rows are refreshed
+one train at a time whenever a card is saved or closed, so induction reads
+this small table instead of scanning job_card. The return to service is not
+stored: it is projected from the remaining work at read time, so a train
+whose cards stay open keeps moving forward instead of showing a past date.
+"""
+import math
+from datetime import datetime, timedelta
+
+MAINTENANCE_HOURS_PER_DAY = 8.0   # workshop hours available per train per night
+PARTS_LEAD_DAYS = 3               # extra days when a card is waiting for parts
+
+SEVERITY_RANK = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
+UNKNOWN_SEVERITY_RANK = 3         # unrated cards are treated as High
+
+# ---------------- Eligibility rule ----------------
+IBL_SEVERITY_RANK = 3             # any open High/Critical card → IBL
+IBL_PARTS_SEVERITY_RANK = 2       # Medium or worse waiting for parts → IBL
+MAX_DEFERRED_HOURS = 4.0          # more minor work than this → IBL
+
+def severity_rank(severity):
+    return SEVERITY_RANK.get(severity, UNKNOWN_SEVERITY_RANK)
+
+def blocks_service(max_rank, parts_pending_rank, open_hours):
+    """
+    Severity-aware rule: minor open cards are deferred and the train stays
+    eligible; serious or parts-blocked work sends it to IBL.
+    """
+    if max_rank >= IBL_SEVERITY_RANK:
+        return True
+    if parts_pending_rank >= IBL_PARTS_SEVERITY_RANK:
+        return True
+    return open_hours > MAX_DEFERRED_HOURS
+
+def release_days(open_hours, parts_pending):
+    """
+    Nights until a blocked train is back: its remaining hours at
+    MAINTENANCE_HOURS_PER_DAY (at least one night), plus the parts lead time.
+    """
+    days = max(1, math.ceil(float(open_hours or 0) / MAINTENANCE_HOURS_PER_DAY))
+    if parts_pending:
+        days += PARTS_LEAD_DAYS
+    return days
+
+def forecast_release(row, at):
+    """
+    Projected return to service, as seen at `at`, for a workload row (dict
+    with blocks_service, open_hours, parts_pending_cards).
+    """
+    if not row["blocks_service"]:
+        return at
+    return at + timedelta(days=release_days(row["open_hours"], row["parts_pending_cards"]))
+
+def with_forecast(rows, at=None):
+    at = at or datetime.now()
+    rows = [dict(row, forecast_release=forecast_release(row, at)) for row in rows]
+    rows.sort(key=lambda r: (not r["blocks_service"], r["forecast_release"], r["train_id"]))
+    return rows
+
+# ---------------- Storage ----------------
+def create_workload_table(curr):
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS train_maintenance_workload (
+            train_id INT PRIMARY KEY,
+            open_cards INT NOT NULL,
+            open_hours NUMERIC NOT NULL,
+            max_severity VARCHAR(20),
+            parts_pending_cards INT NOT NULL,
+            blocks_service BOOLEAN NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def refresh_train_workload(curr, train_id):
+    """
+    Recompute one train's row from its open job cards.
+    """
+    curr.execute("""
+        SELECT severity, estimated_hours, parts_pending
+        FROM job_card
+        WHERE train_id = %s AND status = 'Open'
+    """, (train_id,))
+    cards = curr.fetchall()
+
+    if not cards:
+        curr.execute("DELETE FROM train_maintenance_workload WHERE train_id = %s", (train_id,))
+        return
+
+    open_hours = 0.0
+    max_rank, parts_rank, parts_cards = 0, 0, 0
+    max_severity = None
+    for severity, hours, parts_pending in cards:
+        rank = severity_rank(severity)
+        # a card without an estimate is assumed to take a full night
+        open_hours += float(hours) if hours is not None else MAINTENANCE_HOURS_PER_DAY
+        if rank > max_rank:
+            max_rank, max_severity = rank, severity
+        if parts_pending:
+            parts_cards += 1
+            parts_rank = max(parts_rank, rank)
+
+    blocked = blocks_service(max_rank, parts_rank, open_hours)
+
+    curr.execute("""
+        INSERT INTO train_maintenance_workload (
+            train_id, open_cards, open_hours, max_severity, parts_pending_cards,
+            blocks_service, updated_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (train_id) DO UPDATE SET
+            open_cards = EXCLUDED.open_cards,
+            open_hours = EXCLUDED.open_hours,
+            max_severity = EXCLUDED.max_severity,
+            parts_pending_cards = EXCLUDED.parts_pending_cards,
+            blocks_service = EXCLUDED.blocks_service,
+            updated_at = EXCLUDED.updated_at
+    """, (train_id, len(cards), open_hours, max_severity, parts_cards, blocked))
+
+def rebuild_workloads(curr):
+    """
+    Full rebuild, for first use or after job cards were changed outside the app.
+    """
+    curr.execute("DELETE FROM train_maintenance_workload")
+    curr.execute("SELECT DISTINCT train_id FROM job_card WHERE status = 'Open'")
+    for (train_id,) in curr.fetchall():
+        refresh_train_workload(curr, train_id)
+
+def close_job_card(curr, job_id, closed_at=None):
+    """
+    Close a card and refresh its train. Returns the train_id, or None if
+    the card does not exist.
+    """
+    closed_at = closed_at or datetime.now()
+    curr.execute("""
+        UPDATE job_card SET status = 'Closed', closed_at = %s
+        WHERE job_id = %s
+        RETURNING train_id
+    """, (closed_at, job_id))
+    row = curr.fetchone()
+    if row is None:
+        return None
+    refresh_train_workload(curr, row[0])
+    return row[0]
@@ -0,0 +1,79 @@
+# ---------------- Fleet records ----------------
+# One TrainRecord per train flows through the whole induction pipeline
+# (fetch -> scoring -> save). Values are coerced once when the row is read,
+# so scoring never re-applies float() to Decimals, and __slots__ keeps a
+# record at a fraction of the size of a RealDictRow.
+
+# order of the component scores stored in TrainRecord.breakdown
+COMPONENTS = ("fitness", "branding", "mileage", "cleaning", "geometry")
+
+def _float(val):
+    # NUMERIC columns arrive as Decimal
+    return None if val is None else float(val)
+
+def _bool(val):
+    return None if val is None else bool(val)
+
+class TrainRecord:
+    # feature columns, in FEATURE_QUERY select order
+    FIELDS = (
+        "train_id", "fitness_valid", "job_card_open", "priority_level",
+        "cumulative_km", "required", "cleaning_status", "estimated_shunt_moves",
+        "branding_hours_owed", "branding_hours_required", "cleaning_ready",
+        "bay_id", "bay_position_index", "distance_to_exit_meters", "blocked", "blocks_service",
+        "depot_id",
+    )
+    __slots__ = FIELDS + ("shunt_moves", "score", "breakdown")
+
+    def __init__(self, train_id, fitness_valid=False, job_card_open=False, priority_level=None,
+                 cumulative_km=None, required=None, cleaning_status=None, estimated_shunt_moves=None,
+                 branding_hours_owed=None, branding_hours_required=None, cleaning_ready=False,
+                 bay_id=None, bay_position_index=None, distance_to_exit_meters=None, blocked=False,
+                 blocks_service=None, depot_id=None):
+        self.train_id = train_id
+        self.fitness_valid = bool(fitness_valid)
+        self.job_card_open = bool(job_card_open)      # any open job card
+        self.priority_level = priority_level
+        self.cumulative_km = _float(cumulative_km)
+        self.required = _bool(required)          # None = no cleaning scheduled
+        self.cleaning_status = cleaning_status
+        self.estimated_shunt_moves = _float(estimated_shunt_moves)
+        self.branding_hours_owed = _float(branding_hours_owed)
+        self.branding_hours_required = _float(branding_hours_required)
+        self.cleaning_ready = bool(cleaning_ready)  # planned to finish before departure
+        self.bay_id = bay_id
+        self.bay_position_index = bay_position_index
+        self.distance_to_exit_meters = _float(distance_to_exit_meters)
+        self.blocked = bool(blocked)
+        # open work serious enough for IBL (maintenance.py); None = not known,
+        # treated as "any open card blocks"
+        self.blocks_service = _bool(blocks_service)
+        self.depot_id = depot_id                 # bays are numbered per depot
+        self.shunt_moves = None                  # computed by yard.apply_shunt_moves
+        self.score = None
+        self.breakdown = None                    # tuple ordered as COMPONENTS
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def copy(self):
+        other = TrainRecord.__new__(TrainRecord)
+        for name in TrainRecord.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        data["shunt_moves"] = self.shunt_moves
+        data["score"] = self.score
+        if self.breakdown is not None:
+            data.update(zip(COMPONENTS, self.breakdown))
+        return data
+
+    def effective_shunt_moves(self):
+        # layout-derived moves when the train has a bay, else the entered estimate
+        return self.shunt_moves if self.shunt_moves is not None else self.estimated_shunt_moves
+
+    def __repr__(self):
+        return f"TrainRecord(train_id={self.train_id!r}, score={self.score!r})"
@@ -0,0 +1,222 @@
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime, timedelta
+
+from db import get_connection
+from fin import induction_pipeline, IncompletePlan
+from schema import ensure_schema
+
+# ---------------- Schedule (cutoff times per depot) ----------------
+# per depot, e.g.
+#   KMRL_SCHEDULE='{"1": {"cutoffs": ["21:00", "03:30"], "first_departure": "05:00", "required_count": 3}}'
+# cutoffs: local times at which induction is triggered
+# first_departure: the plan must be published before this time
+def load_schedule(text):
+    schedule = {}
+    for depot_id, cfg in json.loads(text or "{}").items():
+        if not cfg.get("cutoffs") or not cfg.get("first_departure"):
+            raise ValueError(f"depot {depot_id}: schedule needs 'cutoffs' and 'first_departure'")
+        for hhmm in cfg["cutoffs"] + [cfg["first_departure"]]:
+            datetime.strptime(hhmm, "%H:%M")  # raises on a malformed time
+        schedule[int(depot_id)] = cfg
+    return schedule
+
+SCHEDULE = load_schedule(os.environ.get("KMRL_SCHEDULE"))
+
+RUN_BUDGET_SECONDS = 120   # hard wall-clock budget per run, publish included
+KILL_GRACE_SECONDS = 5     # after terminate(), wait this long before kill()
+POLL_SECONDS = 30          # upper bound on a single sleep between checks
+RETRY_SECONDS = 60         # wait before retrying after the loop itself failed
+
+# ---------------- Run log ----------------
+def create_run_log_table(curr):
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS induction_run_log (
+            id SERIAL PRIMARY KEY,
+            depot_id INT,
+            scheduled_for TIMESTAMP,
+            departure_at TIMESTAMP,
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP NOT NULL,
+            duration_ms NUMERIC,
+            outcome VARCHAR(20) NOT NULL,
+            ready_before_departure BOOLEAN,
+            message TEXT
+        )
+    """)
+
+def has_published_run(depot_id, departure_at):
+    conn = get_connection()
+    curr = conn.cursor()
+    curr.execute("""
+        SELECT 1 FROM induction_run_log
+        WHERE depot_id = %s AND departure_at = %s AND outcome = 'Published'
+        LIMIT 1
+    """, (depot_id, departure_at))
+    found = curr.fetchone() is not None
+    curr.close()
+    conn.close()
+    return found
+
+def log_run(depot_id, scheduled_for, departure_at, started_at, finished_at, outcome, message=None):
+    # a failed run is still "ready" if an earlier cutoff already published a
+    # plan for this same departure
+    if outcome == "Published":
+        ready = finished_at <= departure_at
+    else:
+        ready = finished_at <= departure_at and has_published_run(depot_id, departure_at)
+
+    conn = get_connection()
+    curr = conn.cursor()
+    curr.execute("""
+        INSERT INTO induction_run_log (
+            depot_id, scheduled_for, departure_at, started_at, finished_at,
+            duration_ms, outcome, ready_before_departure, message
+        ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    """, (
+        depot_id,
+        scheduled_for,
+        departure_at,
+        started_at,
+        finished_at,
+        round((finished_at - started_at).total_seconds() * 1000.0, 1),
+        outcome,
+        ready,
+        message
+    ))
+    conn.commit()
+    curr.close()
+    conn.close()
+
+# ---------------- Budgeted run ----------------
+def pipeline_worker(pipe, depot_id, required_count, target_time):
+    # runs in the child process; reports (outcome, message) back over pipe
+    try:
+        induction_pipeline(required_count, depot_id, target_time, require_complete=True)
+        pipe.send(("Published", None))
+    except IncompletePlan as e:
+        pipe.send(("Incomplete", str(e)))
+    except Exception as e:
+        pipe.send(("Failed", str(e)))
+    finally:
+        pipe.close()
+
+def run_with_budget(depot_id, required_count, target_time=None, budget=RUN_BUDGET_SECONDS):
+    """
+    Run fin.induction_pipeline for target_time in a child process; it
+    publishes only a complete plan. The budget covers the whole run including
+    the publish: when it runs out the process is killed, its connections
+    drop and PostgreSQL rolls back whatever transaction was open, so nothing
+    commits after the budget and the last published plan stays in place.
+    Returns (outcome, message).
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    proc = multiprocessing.Process(
+        target=pipeline_worker, args=(sender, depot_id, required_count, target_time), daemon=True
+    )
+    proc.start()
+    sender.close()
+    try:
+        if receiver.poll(budget):
+            try:
+                return receiver.recv()
+            except EOFError:
+                proc.join(KILL_GRACE_SECONDS)
+                return "Failed", f"worker exited with code {proc.exitcode}"
+        stop(proc)
+        # the result may have been sent just as the budget ran out
+        try:
+            if receiver.poll(0):
+                return receiver.recv()
+        except EOFError:
+            pass
+        return "Timeout", f"exceeded {budget}s budget"
+    finally:
+        stop(proc)
+        receiver.close()
+
+def stop(proc):
+    if proc.is_alive():
+        proc.terminate()
+        proc.join(KILL_GRACE_SECONDS)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+
+# ---------------- Scheduling ----------------
+def at_time(day, hhmm):
+    hour, minute = (int(x) for x in hhmm.split(":"))
+    return datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+
+def next_departure(after, hhmm):
+    departure = at_time(after.date(), hhmm)
+    if departure <= after:
+        departure += timedelta(days=1)
+    return departure
+
+def next_due(now, schedule=None):
+    """
+    Return (scheduled_for, depot_ids) for the next cutoff strictly after now.
+    Depots sharing that cutoff are returned together.
+    """
+    schedule = SCHEDULE if schedule is None else schedule
+    due = {}
+    for depot_id, cfg in schedule.items():
+        for cutoff in cfg["cutoffs"]:
+            scheduled_for = at_time(now.date(), cutoff)
+            if scheduled_for <= now:
+                scheduled_for += timedelta(days=1)
+            due.setdefault(scheduled_for, []).append(depot_id)
+    scheduled_for = min(due)
+    return scheduled_for, due[scheduled_for]
+
+def run_scheduled(depot_id, scheduled_for):
+    cfg = SCHEDULE[depot_id]
+    departure_at = next_departure(scheduled_for, cfg["first_departure"])
+    started_at = datetime.now()
+    try:
+        outcome, message = run_with_budget(depot_id, cfg.get("required_count", 3), departure_at)
+    except Exception as e:
+        outcome, message = "Failed", str(e)
+    finished_at = datetime.now()
+
+    print(f"[{finished_at:%Y-%m-%d %H:%M:%S}] depot {depot_id}: {outcome}"
+          f" in {(finished_at - started_at).total_seconds():.2f}s" + (f" ({message})" if message else ""))
+    # the database being down must not take the scheduler with it
+    try:
+        log_run(depot_id, scheduled_for, departure_at, started_at, finished_at, outcome, message)
+    except Exception as e:
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] depot {depot_id}: could not log run: {e}")
+    return outcome
+
+def run_forever():
+    if not SCHEDULE:
+        raise SystemExit("no depots scheduled; set KMRL_SCHEDULE")
+    try:
+        ensure_schema()
+    except Exception as e:
+        # every run calls ensure_schema again, so this is retried later
+        print("Schema setup failed, continuing:", e)
+    while True:
+        try:
+            scheduled_for, depot_ids = next_due(datetime.now())
+            # sleep in short steps so clock changes (NTP, DST) are picked up
+            while True:
+                remaining = (scheduled_for - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, POLL_SECONDS))
+            for depot_id in depot_ids:
+                try:
+                    run_scheduled(depot_id, scheduled_for)
+                except Exception as e:
+                    print(f"depot {depot_id}: run at {scheduled_for} failed: {e}")
+        except Exception as e:
+            print("Scheduler loop error, retrying:", e)
+            time.sleep(RETRY_SECONDS)
+
+# ---------------- Main block ----------------
+if __name__ == "__main__":
+    run_forever()
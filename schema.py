@@ -0,0 +1,108 @@
+"""
+Schema setup for the tables and columns the induction code adds on top of
+the base data model.
+
+Each migration runs once per database and is recorded in schema_migrations.
+ensure_schema() is called by every entry point (CLI, scheduler, web app,
+planners) before they read or write; once the database is up to date it is
+a single SELECT, and after the first success in a process it is free. DDL
+therefore no longer runs (or takes table locks) on every induction run.
+"""
+from db import get_connection
+
+# pg_advisory_xact_lock key ("KMRL"), so concurrent starters migrate once
+MIGRATION_LOCK = 0x4B4D524C
+
+_ready = False
+
+def _induction_list(curr):
+    from fin import create_induction_table
+    create_induction_table(curr)
+
+def _branding(curr):
+    from branding import create_branding_tables
+    create_branding_tables(curr)
+
+def _cleaning(curr):
+    from cleaning import create_cleaning_columns
+    create_cleaning_columns(curr)
+
+def _workload(curr):
+    from maintenance import create_workload_table, rebuild_workloads
+    create_workload_table(curr)
+    rebuild_workloads(curr)
+
+def _validity(curr):
+    from fin import create_validity_indexes
+    create_validity_indexes(curr)
+
+def _horizon(curr):
+    from horizon import create_horizon_table
+    create_horizon_table(curr)
+
+def _run_log(curr):
+    from scheduler import create_run_log_table
+    create_run_log_table(curr)
+
+# (version, name, step); append only, never renumber
+MIGRATIONS = [
+    (1, "train_induction_list", _induction_list),
+    (2, "branding exposure ledger and deficit", _branding),
+    (3, "cleaning_schedule planned start/end", _cleaning),
+    (4, "train_maintenance_workload", _workload),
+    (5, "induction_horizon_plan", _horizon),
+    (6, "induction_run_log", _run_log),
+    (7, "validity_range() and validity indexes", _validity),
+]
+
+def applied_versions(curr):
+    curr.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not curr.fetchone()[0]:
+        return set()
+    curr.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in curr.fetchall()}
+
+def migrate(conn):
+    """
+    Apply pending migrations in one transaction. Returns the versions applied.
+    """
+    curr = conn.cursor()
+    done = applied_versions(curr)
+    if all(version in done for version, _, _ in MIGRATIONS):
+        conn.rollback()
+        curr.close()
+        return []
+
+    curr.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK,))
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # re-read under the lock: another process may have just finished
+    done = applied_versions(curr)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        step(curr)
+        curr.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        applied.append(version)
+    conn.commit()
+    curr.close()
+    return applied
+
+def ensure_schema():
+    global _ready
+    if _ready:
+        return
+    conn = get_connection()
+    try:
+        applied = migrate(conn)
+    finally:
+        conn.close()
+    if applied:
+        print("Applied schema migrations:", ", ".join(map(str, applied)))
+    _ready = True
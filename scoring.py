@@ -0,0 +1,220 @@
+"""
+Ranking strategies over one fleet snapshot.
+
+Every strategy takes a list of records.TrainRecord (as returned by
+fin.fetch_trains) and returns (induction, standby, ibl). Strategies are
+registered by name in STRATEGIES, so several policies can be evaluated
+side by side on a single fetch with run_strategies().
+"""
+from yard import apply_departure_moves
+
+# ---------------- Weights (tune these as per KMRL priorities) ----------------
+WEIGHTS = {
+    "fitness": 5.0,
+    "branding": 3.0,
+    "mileage": 2.0,
+    "cleaning": 1.0,
+    "geometry": 1.0
+}
+
+# ---------------- Classification thresholds ----------------
+THRESHOLD_INDUCTION = 7   # score >= 7 → induction
+THRESHOLD_STANDBY = 3     # score 3–7 → standby
+# score < 3 → IBL (forced)
+
+# ---------------- Registry ----------------
+STRATEGIES = {}
+
+def register(name):
+    def decorator(func):
+        STRATEGIES[name] = func
+        return func
+    return decorator
+
+def run_strategy(name, trains, required_count):
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name} (known: {', '.join(sorted(STRATEGIES))})")
+    induction, standby, ibl = STRATEGIES[name](trains, required_count)
+    # scores used next-out moves; the published moves follow the departure order
+    apply_departure_moves(trains, induction)
+    return induction, standby, ibl
+
+def run_strategies(trains, required_count, names=None):
+    """
+    Evaluate several strategies over the same snapshot.
+    Each strategy scores its own copies, so results don't overwrite each other.
+    Returns {name: (induction, standby, ibl)}.
+    """
+    results = {}
+    for name in names or sorted(STRATEGIES):
+        results[name] = run_strategy(name, [t.copy() for t in trains], required_count)
+    return results
+
+# ---------------- Shared helpers ----------------
+def fleet_average_km(trains):
+    mileage_values = [t.cumulative_km for t in trains if t.cumulative_km is not None]
+    return sum(mileage_values) / len(mileage_values) if mileage_values else 0.0
+
+def is_eligible(train):
+    # severity-aware: deferred minor cards keep a train eligible
+    blocked = train.job_card_open if train.blocks_service is None else train.blocks_service
+    return train.fitness_valid and not blocked
+
+# ---------------- Normalised components (0..1) ----------------
+# Components take a records.TrainRecord; numeric fields are already floats.
+def fitness_component(train):
+    return 1 if train.fitness_valid else 0
+
+def branding_component(train):
+    level = train.priority_level
+    if level == "High":
+        priority = 1.0
+    elif level == "Medium":
+        priority = 0.5
+    else:
+        priority = 0.0
+
+    # precomputed by branding.refresh_train_deficit; no row = no ledger yet
+    owed = train.branding_hours_owed
+    required = train.branding_hours_required
+    if owed is None or not required:
+        return priority
+    deficit = min(1.0, owed / required)
+    return 0.5 * priority + 0.5 * deficit
+
+def mileage_component(train, avg_mileage):
+    if train.cumulative_km is None:
+        return 0.0
+    deviation = abs(train.cumulative_km - avg_mileage) / 1000.0
+    return max(0.0, 1.0 - deviation)
+
+def cleaning_component(train):
+    # cleaning_ready: cleaning.py planned it for this departure, finishing before it
+    if train.required and train.cleaning_status != "Done" and not train.cleaning_ready:
+        return 0.0
+    return 1.0
+
+def geometry_component(train):
+    shunts = train.effective_shunt_moves()
+    if shunts is None:
+        return 0.5
+    score = max(0.0, 1.0 - (shunts / 10.0))
+    return score
+
+# ---------------- Raw (unnormalised) scores ----------------
+def branding_score(train):
+    level = train.priority_level
+    if level == "High":
+        return 10
+    elif level == "Medium":
+        return 5
+    return 0
+
+def mileage_score(train, avg_mileage):
+    if train.cumulative_km is None:
+        return 0
+    return -abs(train.cumulative_km - avg_mileage) / 100.0
+
+def cleaning_score(train):
+    if train.required and train.cleaning_status != "Done" and not train.cleaning_ready:
+        return -5
+    return 2
+
+def geometry_score(train):
+    shunts = train.effective_shunt_moves()
+    if shunts is None:
+        return 0
+    return -shunts
+
+# ---------------- Strategies ----------------
+@register("weighted_top_n")
+def weighted_top_n(trains, required_count):
+    """
+    Weighted sum of normalised components; best required_count are inducted.
+    """
+    candidates, ibl = [], []
+    avg_mileage = fleet_average_km(trains)
+
+    for t in trains:
+        if not is_eligible(t):
+            ibl.append(t)
+        else:
+            fitness = fitness_component(t)
+            branding = branding_component(t)
+            mileage  = mileage_component(t, avg_mileage)
+            cleaning = cleaning_component(t)
+            geometry = geometry_component(t)
+            t.score = (
+                WEIGHTS["fitness"]  * fitness +
+                WEIGHTS["branding"] * branding +
+                WEIGHTS["mileage"]  * mileage +
+                WEIGHTS["cleaning"] * cleaning +
+                WEIGHTS["geometry"] * geometry
+            )
+            t.breakdown = (fitness, branding, mileage, cleaning, geometry)
+            candidates.append(t)
+
+    ranked = sorted(candidates, key=lambda x: x.score, reverse=True)
+    return ranked[:required_count], ranked[required_count:], ibl
+
+@register("raw_top_n")
+def raw_top_n(trains, required_count):
+    """
+    Unweighted sum of raw scores; best required_count are inducted.
+    """
+    candidates, ibl = [], []
+    avg_mileage = fleet_average_km(trains)
+
+    for t in trains:
+        if not is_eligible(t):
+            ibl.append(t)
+        else:
+            fitness = 10
+            branding = branding_score(t)
+            mileage = mileage_score(t, avg_mileage)
+            cleaning = cleaning_score(t)
+            geometry = geometry_score(t)
+            t.score = fitness + branding + mileage + cleaning + geometry
+            t.breakdown = (fitness, branding, mileage, cleaning, geometry)
+            candidates.append(t)
+
+    ranked = sorted(candidates, key=lambda x: x.score, reverse=True)
+    return ranked[:required_count], ranked[required_count:], ibl
+
+@register("threshold")
+def threshold(trains, required_count=None):
+    """
+    Weighted raw scores classified by THRESHOLD_INDUCTION / THRESHOLD_STANDBY.
+    required_count is ignored: every train over the threshold is inducted.
+    """
+    induction, standby, ibl = [], [], []
+    avg_mileage = fleet_average_km(trains)
+
+    for t in trains:
+        if not is_eligible(t):
+            # Not eligible → IBL
+            t.score = 0
+            ibl.append(t)
+            continue
+
+        fitness = WEIGHTS["fitness"] * fitness_component(t)
+        branding = WEIGHTS["branding"] * branding_score(t)
+        mileage = WEIGHTS["mileage"] * mileage_score(t, avg_mileage)
+        cleaning = WEIGHTS["cleaning"] * cleaning_score(t)
+        geometry = WEIGHTS["geometry"] * geometry_score(t)
+        t.score = fitness + branding + mileage + cleaning + geometry
+        t.breakdown = (fitness, branding, mileage, cleaning, geometry)
+
+        if t.score >= THRESHOLD_INDUCTION:
+            induction.append(t)
+        elif t.score >= THRESHOLD_STANDBY:
+            standby.append(t)
+        else:
+            ibl.append(t)  # Score < 3 → IBL
+
+    by_score = lambda x: x.score
+    return (
+        sorted(induction, key=by_score, reverse=True),
+        sorted(standby, key=by_score, reverse=True),
+        sorted(ibl, key=by_score, reverse=True)
+    )
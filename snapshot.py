@@ -0,0 +1,201 @@
+"""
+On-disk fleet snapshots for replay and offline what-if runs.
+
+A snapshot is the exact feature set an induction run ranked, stored column
+by column so it can be memory-mapped and read without copying:
+
+    b"KMRLSNP1" | uint32 header length | JSON header | padding | columns
+
+Numeric columns are float64 (NaN = NULL), flags are int8 (-1 = NULL) and
+text-like columns are int32 codes into a dictionary kept in the header.
+Replaying a snapshot needs no database: records are rebuilt from the
+columns and handed to the scoring strategies.
+"""
+import array
+import json
+import math
+import mmap
+import os
+import struct
+import uuid
+from datetime import datetime
+
+from records import TrainRecord
+
+MAGIC = b"KMRLSNP1"
+ALIGN = 8
+
+# column name -> storage: "q" int64, "d" float64, "b" int8 flag, "s" dictionary code
+SCHEMA = {
+    "train_id": "q",
+    "fitness_valid": "b",
+    "job_card_open": "b",
+    "priority_level": "s",
+    "cumulative_km": "d",
+    "required": "b",
+    "cleaning_status": "s",
+    "estimated_shunt_moves": "d",
+    "branding_hours_owed": "d",
+    "branding_hours_required": "d",
+    "cleaning_ready": "b",
+    "bay_id": "s",
+    "bay_position_index": "d",
+    "distance_to_exit_meters": "d",
+    "blocked": "b",
+    "blocks_service": "b",
+    "depot_id": "s",
+    "shunt_moves": "d",
+}
+TYPECODES = {"q": "q", "d": "d", "b": "b", "s": "i"}
+
+# ---------------- Writing ----------------
+def _encode(kind, values):
+    if kind == "q":
+        return array.array("q", values), None
+    if kind == "d":
+        return array.array("d", (math.nan if v is None else float(v) for v in values)), None
+    if kind == "b":
+        return array.array("b", (-1 if v is None else int(bool(v)) for v in values)), None
+    dictionary, codes = [], {}
+    out = array.array("i")
+    for v in values:
+        if v is None:
+            out.append(-1)
+            continue
+        if v not in codes:
+            codes[v] = len(dictionary)
+            dictionary.append(v)
+        out.append(codes[v])
+    return out, dictionary
+
+def write_snapshot(path, trains, meta=None):
+    """
+    Write the TrainRecords' features (before scoring) to path.
+    """
+    blobs, columns = [], []
+    for name, kind in SCHEMA.items():
+        data, dictionary = _encode(kind, [getattr(t, name) for t in trains])
+        col = {"name": name, "kind": kind, "nbytes": len(data) * data.itemsize}
+        if dictionary is not None:
+            col["dictionary"] = dictionary
+        columns.append(col)
+        blobs.append(data.tobytes())
+
+    header = {"version": 1, "rows": len(trains), "meta": meta or {}, "columns": columns}
+    # offsets are relative to the start of the data section
+    offset = 0
+    for col in columns:
+        col["offset"] = offset
+        offset += col["nbytes"] + (-col["nbytes"] % ALIGN)
+    header_bytes = json.dumps(header, default=str).encode()
+    prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    prefix += b"\0" * (-len(prefix) % ALIGN)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        for blob in blobs:
+            f.write(blob)
+            f.write(b"\0" * (-len(blob) % ALIGN))
+    os.replace(tmp, path)
+    return path
+
+def snapshot_path(directory, target_time=None, depot_id=None, created_at=None):
+    """
+    One file per run: several runs (the 21:00 and 03:30 cutoffs, repeated
+    dry-runs) plan the same departure, so the name carries the run time and
+    a random suffix as well as the target.
+    """
+    created_at = created_at or datetime.now()
+    target = (target_time or created_at).strftime("%Y%m%dT%H%M%S")
+    run = created_at.strftime("%Y%m%dT%H%M%S")
+    depot = "all" if depot_id is None else f"depot{depot_id}"
+    return os.path.join(directory, f"induction-{depot}-{target}-run{run}-{uuid.uuid4().hex[:8]}.kmsnap")
+
+# ---------------- Reading ----------------
+class Snapshot:
+    """
+    Memory-mapped snapshot. columns[name] is a zero-copy memoryview.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a fleet snapshot")
+        (length,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + length])
+        data_start = start + length + (-(start + length) % ALIGN)
+
+        self.rows = header["rows"]
+        self.meta = header["meta"]
+        self.dictionaries = {}
+        self.columns = {}
+        self._view = memoryview(self._mm)
+        for col in header["columns"]:
+            begin = data_start + col["offset"]
+            raw = self._view[begin:begin + col["nbytes"]]
+            self.columns[col["name"]] = raw.cast(TYPECODES[col["kind"]])
+            raw.release()
+            if "dictionary" in col:
+                self.dictionaries[col["name"]] = col["dictionary"]
+        self._kinds = {col["name"]: col["kind"] for col in header["columns"]}
+
+    def value(self, name, i):
+        if name not in self.columns:  # column added after the file was written
+            return None
+        raw = self.columns[name][i]
+        kind = self._kinds[name]
+        if kind == "d":
+            return None if math.isnan(raw) else raw
+        if kind == "b":
+            return None if raw < 0 else bool(raw)
+        if kind == "s":
+            return None if raw < 0 else self.dictionaries[name][raw]
+        return raw
+
+    def records(self):
+        """
+        Rebuild the TrainRecords exactly as the original run saw them.
+        """
+        trains = []
+        for i in range(self.rows):
+            t = TrainRecord(*(self.value(name, i) for name in TrainRecord.FIELDS))
+            position = self.value("bay_position_index", i)
+            t.bay_position_index = None if position is None else int(position)
+            t.shunt_moves = self.value("shunt_moves", i)
+            trains.append(t)
+        return trains
+
+    def close(self):
+        # views must be released before the map can be closed
+        for col in self.columns.values():
+            col.release()
+        self.columns = {}
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------------- Replay ----------------
+def replay(path, strategies=None, required_count=None):
+    """
+    Re-run scoring strategies against a snapshot with no database access.
+    Returns (meta, {strategy: (induction, standby, ibl)}).
+    """
+    from scoring import run_strategies
+    snap = Snapshot(path)
+    try:
+        trains = snap.records()
+        meta = dict(snap.meta)
+    finally:
+        snap.close()
+    if required_count is None:
+        required_count = meta.get("required_count", 3)
+    return meta, run_strategies(trains, required_count, strategies)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from cleaning import plan_cleanings
+
+START = datetime(2026, 10, 19, 21, 0)
+CUTOFF = datetime(2026, 10, 20, 5, 0)
+
+def test_jobs_share_bays_and_crews():
+    jobs = [(1, 101, 2, None), (2, 102, 2, None), (3, 103, 2, None)]
+    assignments, summary = plan_cleanings(jobs, ["B1", "B2"], ["C1", "C2"], START, CUTOFF)
+    ends = sorted(a["planned_end"] for a in assignments)
+    assert ends == [datetime(2026, 10, 19, 23), datetime(2026, 10, 19, 23), datetime(2026, 10, 20, 1)]
+    assert summary == {"jobs": 3, "makespan_hours": 4.0, "missed": 0, "ready_by_cutoff": 3}
+
+def test_crews_limit_parallel_work():
+    jobs = [(1, 101, 3, None), (2, 102, 3, None)]
+    assignments, _ = plan_cleanings(jobs, ["B1", "B2"], ["C1"], START, CUTOFF)
+    assert sorted(a["planned_start"] for a in assignments) == [START, datetime(2026, 10, 20, 0)]
+
+def test_job_that_cannot_make_its_deadline_is_deferred():
+    # job 1 can never finish by its deadline; it must not delay job 2
+    jobs = [(1, 101, 6, datetime(2026, 10, 19, 23)), (2, 102, 4, datetime(2026, 10, 20, 1))]
+    assignments, summary = plan_cleanings(jobs, ["B1"], ["C1"], START, CUTOFF)
+    by_key = {a["key"]: a for a in assignments}
+    assert by_key[2]["planned_start"] == START and not by_key[2]["late"]
+    assert by_key[1]["planned_start"] == datetime(2026, 10, 20, 1) and by_key[1]["late"]
+    assert summary["missed"] == 1
+
+def test_no_jobs():
+    assert plan_cleanings([], ["B1"], ["C1"], START, CUTOFF) == (
+        [], {"jobs": 0, "makespan_hours": 0.0, "missed": 0, "ready_by_cutoff": 0}
+    )
@@ -0,0 +1,60 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import scheduler
+from fin import IncompletePlan
+
+SCHEDULE = {
+    1: {"cutoffs": ["21:00", "03:30"], "first_departure": "05:00"},
+    2: {"cutoffs": ["21:00"], "first_departure": "05:30"},
+}
+
+def test_next_due_groups_depots_sharing_a_cutoff():
+    assert scheduler.next_due(datetime(2026, 10, 19, 12, 0), SCHEDULE) == (datetime(2026, 10, 19, 21, 0), [1, 2])
+
+def test_next_due_is_strictly_after_now():
+    assert scheduler.next_due(datetime(2026, 10, 19, 21, 0), SCHEDULE) == (datetime(2026, 10, 20, 3, 30), [1])
+
+def test_next_departure_rolls_to_next_day():
+    assert scheduler.next_departure(datetime(2026, 10, 19, 21, 0), "05:00") == datetime(2026, 10, 20, 5, 0)
+
+def test_load_schedule_rejects_missing_departure():
+    with pytest.raises(ValueError):
+        scheduler.load_schedule('{"1": {"cutoffs": ["21:00"]}}')
+
+def test_load_schedule_keys_by_depot_id():
+    assert scheduler.load_schedule('{"1": {"cutoffs": ["21:00"], "first_departure": "05:00"}}') == {
+        1: {"cutoffs": ["21:00"], "first_departure": "05:00"}
+    }
+
+# the worker is forked, so a patched induction_pipeline runs in the child
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(scheduler, "KILL_GRACE_SECONDS", 1)
+    def use(func):
+        monkeypatch.setattr(scheduler, "induction_pipeline", func)
+    return use
+
+def test_run_with_budget_publishes(pipeline):
+    pipeline(lambda *args, **kwargs: None)
+    assert scheduler.run_with_budget(1, 3, budget=10) == ("Published", None)
+
+def test_run_with_budget_reports_incomplete_plan(pipeline):
+    def incomplete(*args, **kwargs):
+        raise IncompletePlan("only 1 eligible trains for 3 slots")
+    pipeline(incomplete)
+    assert scheduler.run_with_budget(1, 3, budget=10) == ("Incomplete", "only 1 eligible trains for 3 slots")
+
+def test_run_with_budget_kills_a_slow_run(pipeline):
+    pipeline(lambda *args, **kwargs: time.sleep(30))
+    started = time.monotonic()
+    outcome, message = scheduler.run_with_budget(1, 3, budget=0.5)
+    assert outcome == "Timeout"
+    assert time.monotonic() - started < 10
+
+def test_run_with_budget_reports_a_crashed_worker(pipeline):
+    pipeline(lambda *args, **kwargs: os._exit(3))
+    assert scheduler.run_with_budget(1, 3, budget=10) == ("Failed", "worker exited with code 3")
@@ -0,0 +1,30 @@
+from records import TrainRecord
+from snapshot import SCHEMA, Snapshot, replay, write_snapshot
+
+def fleet():
+    return [
+        TrainRecord(1, fitness_valid=True, priority_level="High", cumulative_km=12000.5,
+                    required=True, cleaning_status="Scheduled", cleaning_ready=True,
+                    bay_id="A", bay_position_index=0, distance_to_exit_meters=15.0,
+                    blocks_service=False, depot_id=1),
+        TrainRecord(2, fitness_valid=False, job_card_open=True, blocks_service=True,
+                    branding_hours_owed=3.0, branding_hours_required=10.0, depot_id=2),
+    ]
+
+def test_round_trip_keeps_every_column(tmp_path):
+    trains = fleet()
+    trains[0].shunt_moves = 0.0
+    path = write_snapshot(str(tmp_path / "fleet.kmsnap"), trains, {"required_count": 1})
+    with Snapshot(path) as snap:
+        assert snap.meta == {"required_count": 1}
+        restored = snap.records()
+    for original, copy in zip(trains, restored):
+        for name in SCHEMA:
+            assert getattr(copy, name) == getattr(original, name), name
+
+def test_replay_ranks_without_a_database(tmp_path):
+    path = write_snapshot(str(tmp_path / "fleet.kmsnap"), fleet(), {"required_count": 1})
+    meta, results = replay(path, ["weighted_top_n"])
+    induction, standby, ibl = results["weighted_top_n"]
+    assert [t.train_id for t in induction] == [1]
+    assert [t.train_id for t in ibl] == [2]
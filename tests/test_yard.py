@@ -0,0 +1,39 @@
+from records import TrainRecord
+from yard import BLOCKED_MOVES, apply_departure_moves, apply_shunt_moves, bay_layout, shunt_moves
+
+def train(train_id, bay_id="A", position=0, depot_id=1, blocked=False):
+    return TrainRecord(train_id, fitness_valid=True, bay_id=bay_id, bay_position_index=position,
+                       blocked=blocked, depot_id=depot_id)
+
+def test_bay_layout_orders_front_to_back():
+    layout, blocked = bay_layout([train(3, position=2), train(1, position=0), train(2, position=1)])
+    assert layout == {(1, "A"): (1, 2, 3)}
+    assert blocked == frozenset()
+
+def test_bay_layout_keeps_depots_apart():
+    layout, _ = bay_layout([train(1, depot_id=1), train(2, depot_id=2)])
+    assert layout == {(1, "A"): (1,), (2, "A"): (2,)}
+
+def test_bay_layout_places_duplicate_records_once():
+    layout, _ = bay_layout([train(1, position=0), train(2, position=1), train(1, position=0)])
+    assert layout == {(1, "A"): (1, 2)}
+
+def test_next_out_moves_count_trains_in_front():
+    trains = apply_shunt_moves([train(1, position=0), train(2, position=1), train(3, position=2)])
+    assert [t.shunt_moves for t in trains] == [0.0, 1.0, 2.0]
+
+def test_blocked_train_traps_everything_behind_it():
+    trains = apply_shunt_moves([train(1, position=0, blocked=True), train(2, position=1)])
+    assert [t.shunt_moves for t in trains] == [BLOCKED_MOVES, BLOCKED_MOVES]
+
+def test_shunt_moves_depend_on_departure_order():
+    layout, blocked = bay_layout([train(1, position=0), train(2, position=1)])
+    assert shunt_moves(layout, blocked, [1, 2]) == {1: 0, 2: 0}
+    assert shunt_moves(layout, blocked, [2, 1]) == {2: 1, 1: 0}
+
+def test_apply_departure_moves_uses_ranked_order():
+    fleet = [train(1, position=0), train(2, position=1), train(3, position=2)]
+    departing = [fleet[2], fleet[0]]
+    total = apply_departure_moves(fleet, departing)
+    assert (fleet[2].shunt_moves, fleet[0].shunt_moves) == (2.0, 0.0)
+    assert total == 2
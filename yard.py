@@ -0,0 +1,118 @@
+"""
+Stabling-yard model.
+
+Each bay is a dead-end stack: position 0 is next to the exit. A train can
+only leave once every train stabled in front of it has been shunted out of
+the way, one move per blocking train. A train marked blocked cannot be moved
+at all, so it and everything behind it is stuck.
+
+Results are memoised on (bay occupancy, blocked trains, departure order), so
+repeated evaluations inside an optimiser loop are dictionary lookups.
+"""
+from functools import lru_cache
+
+BLOCKED_MOVES = 10.0   # moves charged to a train that cannot get out (scores as worst geometry)
+
+def bay_layout(trains):
+    """
+    Build ({(depot_id, bay_id): (train_id, ...) front to back},
+    frozenset(blocked ids)) from records carrying bay_id /
+    bay_position_index / distance_to_exit_meters. Bay numbers repeat across
+    depots, and a train is placed once even if it appears in several records.
+    """
+    bays = {}
+    blocked = set()
+    seen = set()
+    for t in trains:
+        if t.bay_id is None or t.train_id in seen:
+            continue
+        seen.add(t.train_id)
+        bays.setdefault((t.depot_id, t.bay_id), []).append(t)
+        if t.blocked:
+            blocked.add(t.train_id)
+
+    inf = float("inf")
+    layout = {}
+    for bay_id, stabled in bays.items():
+        stabled.sort(key=lambda t: (
+            t.bay_position_index if t.bay_position_index is not None else inf,
+            t.distance_to_exit_meters if t.distance_to_exit_meters is not None else inf,
+            t.train_id
+        ))
+        layout[bay_id] = tuple(t.train_id for t in stabled)
+    return layout, frozenset(blocked)
+
+@lru_cache(maxsize=8192)
+def bay_moves(occupancy, blocked, order):
+    """
+    Blocking moves for each train of `order` (all in this bay) departing in
+    that sequence. None for a train that cannot leave.
+    """
+    present = list(occupancy)
+    result = []
+    for train_id in order:
+        idx = present.index(train_id)
+        ahead = present[:idx]
+        if train_id in blocked or any(a in blocked for a in ahead):
+            result.append(None)
+            continue
+        # blocking trains are shunted out and put back in the same order
+        result.append(len(ahead))
+        present.pop(idx)
+    return tuple(result)
+
+def shunt_moves(layout, blocked, order):
+    """
+    Moves per train for a fleet-wide departure order.
+    Returns {train_id: moves or None}; trains not in any bay are left out.
+    """
+    bay_of = {tid: bay_id for bay_id, occupancy in layout.items() for tid in occupancy}
+    per_bay = {}
+    for tid in order:
+        if tid in bay_of:
+            per_bay.setdefault(bay_of[tid], []).append(tid)
+
+    moves = {}
+    for bay_id, bay_order in per_bay.items():
+        occupancy = layout[bay_id]
+        bay_blocked = frozenset(tid for tid in occupancy if tid in blocked)
+        moves.update(zip(bay_order, bay_moves(occupancy, bay_blocked, tuple(bay_order))))
+    return moves
+
+def next_out_moves(layout, blocked):
+    """
+    Moves each train would need if it were the first to leave its bay.
+    """
+    moves = {}
+    for occupancy in layout.values():
+        bay_blocked = frozenset(tid for tid in occupancy if tid in blocked)
+        for tid in occupancy:
+            moves[tid] = bay_moves(occupancy, bay_blocked, (tid,))[0]
+    return moves
+
+def apply_shunt_moves(trains):
+    """
+    Set TrainRecord.shunt_moves from the stabling layout for every train
+    that has a bay; the scorer prefers it over estimated_shunt_moves.
+    """
+    layout, blocked = bay_layout(trains)
+    _set_moves(trains, next_out_moves(layout, blocked))
+    return trains
+
+def apply_departure_moves(trains, departing):
+    """
+    Once the induction list is ranked, trains leave in that order: recompute
+    shunt_moves of the departing records for that sequence, with the whole
+    fetched fleet still in the bays. Returns the total, charging
+    BLOCKED_MOVES for every train that cannot leave.
+    """
+    layout, blocked = bay_layout(trains)
+    moves = shunt_moves(layout, blocked, [t.train_id for t in departing])
+    _set_moves(departing, moves)
+    return sum(BLOCKED_MOVES if m is None else m for m in moves.values())
+
+def _set_moves(trains, moves):
+    for t in trains:
+        if t.train_id in moves:
+            m = moves[t.train_id]
+            t.shunt_moves = BLOCKED_MOVES if m is None else float(m)